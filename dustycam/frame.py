@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass(slots=True)
+class DetectionArray:
+    """
+    Structure-of-arrays view of a frame's detections.
+    Keeps boxes/confidences/classes in contiguous numpy arrays so drawing,
+    filtering and serialization can operate on slices instead of paying
+    per-object attribute and dict lookups.
+    """
+    bbox: np.ndarray          # (N, 4) int32, xyxy
+    confidence: np.ndarray    # (N,) float32
+    class_id: np.ndarray      # (N,) int32
+    labels: List[str]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def to_dicts(self) -> List[Dict]:
+        """Compatibility shim for consumers that expect the list-of-dicts layout."""
+        return [
+            {
+                'bbox': tuple(self.bbox[i]),
+                'conf': float(self.confidence[i]),
+                'cls': int(self.class_id[i]),
+                'label': self.labels[i],
+            }
+            for i in range(len(self.labels))
+        ]
+
+    @classmethod
+    def empty(cls) -> "DetectionArray":
+        return cls(
+            bbox=np.empty((0, 4), dtype=np.int32),
+            confidence=np.empty(0, dtype=np.float32),
+            class_id=np.empty(0, dtype=np.int32),
+            labels=[],
+        )
+
+
+@dataclass(slots=True)
+class FramePacket:
+    """
+    Unit of work passed between nodes.
+    Carries the frame image plus any results accumulated along the chain.
+    """
+    frame_id: int
+    # Monotonic nanoseconds (time.perf_counter_ns): immune to NTP clock
+    # jumps and cheap to read, so frame-to-frame deltas stay trustworthy
+    # at high FPS. Use ns_to_ms() when printing.
+    timestamp: int
+    image: Optional[np.ndarray] = None
+    # Camera-native JPEG for this frame, when the source can deliver one
+    # (e.g. Picamera2's MJPEG stream). Sinks that only ship JPEG bytes use
+    # it as-is instead of re-encoding the decoded image.
+    jpeg_bytes: Optional[bytes] = None
+    # GPU-resident frame (torch CUDA tensor, float32 CHW in [0,1] at model
+    # input size) for sources that decode straight to device memory
+    # (nvJPEG); detectors prefer it and skip the host->device copy.
+    image_cuda: Optional[Any] = None
+    detections: List[Dict] = field(default_factory=list)
+    det_array: Optional[DetectionArray] = None
+    ocr_results: List[Any] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def copy_shallow(self) -> "FramePacket":
+        """
+        Copy the packet without copying the image buffer or the result lists.
+        The lists are shared by reference (copy-on-write): a node that wants
+        to mutate them must first claim its own copy via `_mut_ocr` /
+        `_mut_detections` / `_mut_metadata`. Pure-read nodes therefore
+        allocate nothing per frame.
+        """
+        return replace(self)
+
+    def _mut_ocr(self) -> List[Any]:
+        """Claim a private copy of ocr_results before mutating it."""
+        self.ocr_results = list(self.ocr_results)
+        return self.ocr_results
+
+    def _mut_detections(self) -> List[Dict]:
+        """Claim a private copy of detections before mutating it."""
+        self.detections = list(self.detections)
+        return self.detections
+
+    def _mut_metadata(self) -> Dict[str, Any]:
+        """Claim a private copy of metadata before mutating it."""
+        self.metadata = dict(self.metadata)
+        return self.metadata
+
+
+def ns_to_ms(ns: int) -> float:
+    """Convert a perf_counter_ns delta to milliseconds for printouts."""
+    return ns / 1e6
+
+
+def make_packet(image: np.ndarray, frame_id: int) -> FramePacket:
+    """Convenience constructor stamping the current monotonic time."""
+    return FramePacket(frame_id=frame_id, timestamp=time.perf_counter_ns(), image=image)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import time
+from typing import List, Optional
+
+from dustycam.frame import FramePacket
+
+
+class Node:
+    """
+    Base class for all pipeline nodes.
+    Nodes are connected into a chain with `connect` and process FramePackets
+    via `forward`.
+    """
+
+    # Number of recent packets kept per node for previews/snapshots
+    _cache_size = 8
+
+    def __init__(self, name: str = None):
+        self.name = name or self.__class__.__name__
+        self.children: List["Node"] = []
+        # Fixed-size ring of recent packets, slot-addressed by frame_id.
+        # Overwriting a slot drops the old packet (and its image buffer), so
+        # memory stays bounded instead of growing with the frame history.
+        self._cache: List[Optional[FramePacket]] = [None] * self._cache_size
+        self._last_frame_id: Optional[int] = None
+
+    def connect(self, other: "Node") -> "Node":
+        """Connect this node's output to another node. Returns `other` for chaining."""
+        self.children.append(other)
+        return other
+
+    def forward(self, packet: FramePacket) -> FramePacket:
+        """Process a packet and return it (possibly modified). Override in subclasses."""
+        raise NotImplementedError("Subclasses must implement forward")
+
+    def store_result(self, packet: FramePacket):
+        """Remember the packet this node produced (used for previews)."""
+        self._cache[packet.frame_id % self._cache_size] = packet
+        self._last_frame_id = packet.frame_id
+
+    def _get_from_cache(self, frame_id: int) -> Optional[FramePacket]:
+        slot = self._cache[frame_id % self._cache_size]
+        if slot is not None and slot.frame_id == frame_id:
+            return slot
+        return None
+
+    def get_last_packet(self) -> Optional[FramePacket]:
+        if self._last_frame_id is None:
+            return None
+        return self._get_from_cache(self._last_frame_id)
+
+    def get_last_frame_bytes(self) -> Optional[bytes]:
+        """JPEG-encode the most recent frame this node saw."""
+        packet = self.get_last_packet()
+        if packet is None or packet.image is None:
+            return None
+        import cv2
+        ok, jpeg = cv2.imencode('.jpg', packet.image)
+        return jpeg.tobytes() if ok else None
+
+    def flush(self):
+        """
+        Emit any buffered work. Called by the Runner at shutdown.
+        May return a list of leftover packets for the Runner to propagate.
+        """
+        return None
+
+    def close(self):
+        """Release resources. Override in subclasses that hold handles."""
+        pass
+
+
+class SourceNode(Node):
+    """
+    A node that produces packets rather than receiving them.
+
+    Sources may reuse one preallocated image buffer across packets instead
+    of allocating per frame; downstream nodes that hold a frame beyond the
+    current evaluation or mutate it must take an explicit copy().
+    """
+
+    def next_packet(self) -> Optional[FramePacket]:
+        """Return the next packet, or None when no frame is available."""
+        raise NotImplementedError("Subclasses must implement next_packet")
+
+    def next_packet_blocking(self, timeout: float = 0.1) -> Optional[FramePacket]:
+        """
+        Return the next packet, waiting up to `timeout` when none is ready.
+        The default polls once and sleeps briefly; sources backed by a
+        frame event override this to wake as soon as a frame lands instead
+        of burning CPU in a poll/sleep spin.
+        """
+        packet = self.next_packet()
+        if packet is None:
+            time.sleep(min(timeout, 0.01))
+        return packet
+
+    def forward(self, packet: FramePacket) -> FramePacket:
+        return packet
+
+
+class SinkNode(Node):
+    """A terminal node that consumes packets (writes, displays, discards)."""
+
+    def forward(self, packet: FramePacket) -> FramePacket:
+        return packet
+
+    def consume(self, packet: FramePacket) -> None:
+        """Handle the finished packet. Override in subclasses."""
+        raise NotImplementedError("Subclasses must implement consume")
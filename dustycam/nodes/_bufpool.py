@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+# Per-thread pools of scratch ndarrays keyed by (shape, dtype). Nodes that
+# need working buffers for OpenCV's dst= arguments acquire them here instead
+# of calling np.empty per frame (or holding private copies per consumer), so
+# several motion/drawing consumers on one thread recycle the same few arrays.
+# Thread-locality means concurrent pipelines never hand out a buffer twice.
+
+_MAX_PER_KEY = 8
+
+_local = threading.local()
+
+
+def _pools() -> dict:
+    pools = getattr(_local, "pools", None)
+    if pools is None:
+        pools = {}
+        _local.pools = pools
+    return pools
+
+
+def acquire(shape, dtype=np.uint8) -> np.ndarray:
+    """Get a recycled array of the given shape/dtype, or allocate one."""
+    key = (tuple(shape), np.dtype(dtype).str)
+    stack = _pools().get(key)
+    if stack:
+        return stack.pop()
+    return np.empty(shape, dtype)
+
+
+def release(arr: np.ndarray) -> None:
+    """Return an array to this thread's pool for reuse."""
+    if arr is None:
+        return
+    key = (arr.shape, arr.dtype.str)
+    stack = _pools().setdefault(key, [])
+    if len(stack) < _MAX_PER_KEY:
+        stack.append(arr)
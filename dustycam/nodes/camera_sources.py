@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import cv2
 import numpy as np
+import threading
 import time
 from typing import Optional
 
@@ -23,24 +24,96 @@ class OpenCVSource:
             self._cap.release()
 
 class Picamera2Source:
-    """Picamera2 wrapper."""
-    def __init__(self, size=(320, 240)):
+    """
+    Picamera2 wrapper.
+
+    With zero_copy=True, read() hands out a numpy view of the camera's
+    mmap'd DMA buffer instead of the fresh copy capture_array makes —
+    saving one H*W*3 memcpy per frame. The view is only valid until the
+    next read() (the underlying request is then released back to the
+    camera), so callers must copy anything they retain; leave it off for
+    consumers that hold frames across iterations (previews, buffers).
+    """
+    def __init__(self, size=(320, 240), jpeg_stream: bool = False,
+                 zero_copy: bool = False):
         try:
             from picamera2 import Picamera2
         except ImportError:
             raise RuntimeError("Picamera2 not found")
-            
+
         self._picam2 = Picamera2()
         high_res = (2028, 1520)
+        # With jpeg_stream the ISP hands us already-compressed frames on the
+        # main stream, so streaming sinks can pass them through without a
+        # decode->re-encode round trip.
+        main_format = "MJPEG" if jpeg_stream else "RGB888"
         config = self._picam2.create_video_configuration(
-            main={"size": high_res, "format": "RGB888"},
+            main={"size": high_res, "format": main_format},
             lores={"size": size, "format": "RGB888"}
         )
         self._picam2.configure(config)
+        # Signalled from the camera's completion callback so consumers can
+        # block until a frame actually exists instead of polling read().
+        self._frame_event = threading.Event()
+        self._picam2.pre_callback = lambda request: self._frame_event.set()
         self._picam2.start()
+        self.jpeg_stream = jpeg_stream
+        self.zero_copy = zero_copy
+        self._active_request = None
+        self._active_map = None
+
+    def wait_frame(self, timeout: float = 0.1) -> bool:
+        """Block until the camera signals a new frame (or timeout)."""
+        if self._frame_event.wait(timeout):
+            self._frame_event.clear()
+            return True
+        return False
 
     def read(self) -> Optional[np.ndarray]:
-        return self._picam2.capture_array("lores")
+        if not self.zero_copy:
+            return self._picam2.capture_array("lores")
+        return self._read_zero_copy()
+
+    def _read_zero_copy(self) -> Optional[np.ndarray]:
+        from picamera2 import MappedArray
+        try:
+            request = self._picam2.capture_request()
+        except Exception:
+            return None
+        if request is None:
+            return None
+        # Releasing the previous request recycles its buffer to the camera;
+        # only one frame is mapped at a time.
+        self._release_request()
+        self._active_request = request
+        self._active_map = MappedArray(request, "lores").__enter__()
+        return self._active_map.array
+
+    def _release_request(self) -> None:
+        if self._active_map is not None:
+            self._active_map.__exit__(None, None, None)
+            self._active_map = None
+        if self._active_request is not None:
+            self._active_request.release()
+            self._active_request = None
+
+    def drain(self) -> None:
+        """
+        Drop any backlog so the next read() returns the newest frame.
+        picamera2's request loop recycles completed requests itself and only
+        holds the most recent one, so all that can go stale here is the
+        frame-available signal.
+        """
+        self._frame_event.clear()
+
+    def read_jpeg(self) -> Optional[bytes]:
+        """Camera-native JPEG frame, only available with jpeg_stream=True."""
+        if not self.jpeg_stream:
+            return None
+        try:
+            return bytes(self._picam2.capture_buffer("main"))
+        except Exception:
+            return None
 
     def take_photo(self) -> Optional[np.ndarray]:
         try:
@@ -49,5 +122,6 @@ class Picamera2Source:
             return None
 
     def close(self):
+        self._release_request()
         if self._picam2:
             self._picam2.stop()
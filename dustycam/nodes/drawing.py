@@ -1,15 +1,73 @@
 import cv2
 import numpy as np
+import string
 from typing import List, Dict
 
+from dustycam.node import Node
+
+# Font metrics are constant (Hershey fonts have fixed per-glyph advances),
+# so measure each printable character once at import and size label text by
+# summation instead of calling cv2.getTextSize per box.
+_FONT = cv2.FONT_HERSHEY_SIMPLEX
+_FONT_SCALE = 0.5
+_THICKNESS = 1
+_CHAR_W = {c: cv2.getTextSize(c, _FONT, _FONT_SCALE, _THICKNESS)[0][0]
+           for c in string.printable}
+_TEXT_H = cv2.getTextSize("A", _FONT, _FONT_SCALE, _THICKNESS)[0][1]
+
+
+def _text_width(text: str) -> int:
+    return sum(_CHAR_W.get(c, 8) for c in text)
+
+
+_LABEL_H = 20
+
+# Pre-rasterized label bars (green background + black Hershey text) keyed by
+# the label string. Confidences are bucketed to 0.05 before formatting so the
+# cache stays small and hot; drawing a label becomes one slice assignment
+# instead of a filled rectangle plus a putText rasterization per box.
+_label_glyphs: Dict[str, np.ndarray] = {}
+
+
+def _label_text(label: str, conf: float) -> str:
+    return f"{label} {round(conf * 20) / 20:.2f}"
+
+
+def _label_glyph(text: str) -> np.ndarray:
+    glyph = _label_glyphs.get(text)
+    if glyph is None:
+        w = max(1, _text_width(text))
+        glyph = np.empty((_LABEL_H, w, 3), dtype=np.uint8)
+        glyph[:] = (0, 255, 0)
+        cv2.putText(glyph, text, (0, _LABEL_H - 5), _FONT, _FONT_SCALE, (0, 0, 0), _THICKNESS)
+        _label_glyphs[text] = glyph
+    return glyph
+
+
+def _blit_label(image: np.ndarray, glyph: np.ndarray, x: int, y_bottom: int) -> None:
+    """Copy a label bar into the image above (x, y_bottom), clipped to bounds."""
+    gh, gw = glyph.shape[:2]
+    y0, x0 = y_bottom - gh, x
+    sy0, sx0 = max(0, y0), max(0, x0)
+    sy1 = min(image.shape[0], y_bottom)
+    sx1 = min(image.shape[1], x0 + gw)
+    if sy1 <= sy0 or sx1 <= sx0:
+        return
+    image[sy0:sy1, sx0:sx1] = glyph[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0]
+
 def draw_detections(image: np.ndarray, detections: List[Dict]) -> np.ndarray:
     """
     Draws bounding boxes and labels for any detections found.
-    Detections should be a list of dicts with keys: 'bbox', 'conf', 'label', 'cls'.
+    Detections should be a list of dicts with keys: 'bbox', 'conf', 'label', 'cls',
+    or a DetectionArray (the SoA layout produced by YoloNode).
     """
-    if not detections or image is None:
+    if detections is None or image is None or len(detections) == 0:
         return image
 
+    from dustycam.frame import DetectionArray
+    if isinstance(detections, DetectionArray):
+        return draw_detection_array(image, detections)
+
     # We'll draw directly on the image (in-place modification is standard for opencv drawing)
     
     for det in detections:
@@ -20,20 +78,66 @@ def draw_detections(image: np.ndarray, detections: List[Dict]) -> np.ndarray:
         # Draw box
         # Green color (0, 255, 0)
         cv2.rectangle(image, (x1, y1), (x2, y2), (0, 255, 0), 2)
-        
-        # Draw label
-        text = f"{label} {conf:.2f}"
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        font_scale = 0.5
-        thickness = 1
-        
-        # Get text size
-        (w, h), _ = cv2.getTextSize(text, font, font_scale, thickness)
-        
-        # Draw background for text
-        cv2.rectangle(image, (x1, y1 - 20), (x1 + w, y1), (0, 255, 0), -1)
-        
-        # Draw text
-        cv2.putText(image, text, (x1, y1 - 5), font, font_scale, (0, 0, 0), thickness)
-        
+
+        # Label bar from the glyph cache: rasterized once per unique label,
+        # then a single slice copy per box.
+        _blit_label(image, _label_glyph(_label_text(label, conf)), x1, y1)
+
+    return image
+
+
+def draw_detection_array(image: np.ndarray, arr) -> np.ndarray:
+    """
+    Draws a DetectionArray without the per-box dict overhead of the list
+    path: box borders are painted with numpy slicing and labels are blitted
+    from the shared glyph cache, so no per-box OpenCV call remains.
+    """
+    color = (0, 255, 0)
+    img_h, img_w = image.shape[:2]
+
+    boxes = np.clip(arr.bbox, 0, [img_w - 1, img_h - 1, img_w - 1, img_h - 1]).astype(np.int32)
+
+    for i in range(len(arr)):
+        x1, y1, x2, y2 = boxes[i]
+        # Paint the four border strips directly into the image array
+        image[y1:y1 + 2, x1:x2] = color
+        image[max(y1, y2 - 2):y2, x1:x2] = color
+        image[y1:y2, x1:x1 + 2] = color
+        image[y1:y2, max(x1, x2 - 2):x2] = color
+        # Label bar from the glyph cache
+        text = _label_text(arr.labels[i], float(arr.confidence[i]))
+        _blit_label(image, _label_glyph(text), int(x1), int(y1))
+
     return image
+
+
+class DrawAndEncodeNode(Node):
+    """
+    Fuses detection drawing with JPEG encoding.
+    The annotated frame is encoded exactly once per frame and the bytes are
+    held on `latest`, so every web client (MJPEG stream, snapshot) reads the
+    same cached buffer instead of triggering a re-encode per request.
+    """
+
+    def __init__(self, quality: int = 75):
+        super().__init__(name="DrawAndEncode")
+        self.quality = quality
+        self.latest: bytes = None
+
+    def forward(self, packet):
+        if packet.image is not None:
+            dets = packet.det_array if packet.det_array is not None else packet.detections
+            # Sources hand out cached/reused buffers by reference (see the
+            # SourceNode contract), so draw on a private copy — annotating
+            # packet.image in place would accumulate boxes on shared frames.
+            annotated = packet.image.copy()
+            draw_detections(annotated, dets)
+            ok, buf = cv2.imencode('.jpg', annotated,
+                                   [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if ok:
+                self.latest = buf.tobytes()
+        return packet
+
+    def get_last_frame_bytes(self):
+        # Already encoded in forward; hand back the cached buffer.
+        return self.latest
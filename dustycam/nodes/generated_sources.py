@@ -2,6 +2,44 @@ import cv2
 import numpy as np
 import time
 
+
+def _reflect(u, lo, hi):
+    """
+    Branchless wall reflection: fold an unbounded coordinate `u` into
+    [lo, hi] as a triangle wave. Pure arithmetic (no collision branches),
+    and since it's np-compatible a whole vector of timesteps can be folded
+    in one call.
+    """
+    span = hi - lo
+    if span <= 0:
+        return lo
+    # Plain operators so scalars stay ints and ndarrays broadcast.
+    return lo + span - abs((u - lo) % (2 * span) - span)
+
+
+class _BounceState:
+    """
+    Closed-form bounce trajectory shared by the synthetic sources.
+
+    A point bouncing between `lo` and `hi` traces a triangle wave, so the
+    position at frame t is pure arithmetic — no per-frame velocity state,
+    sign flips or clamping in interpreted Python, and any frame index (or a
+    whole numpy vector of them) can be evaluated directly — O(1) even where
+    a precomputed position table would need lcm-of-spans entries.
+    """
+
+    def __init__(self, x0, y0, vx, vy, x_range, y_range):
+        self._x0, self._y0 = x0, y0
+        self._vx, self._vy = vx, vy
+        self._x_range = x_range  # (lo, hi) inclusive bounds for x
+        self._y_range = y_range
+
+    def position(self, t):
+        x = _reflect(self._x0 + self._vx * t, *self._x_range)
+        y = _reflect(self._y0 + self._vy * t, *self._y_range)
+        return x, y
+
+
 class BouncingBall:
     """Simple state holder for bouncing ball animation."""
     def __init__(self, size=(640, 480), radius=30, color=(0,0,255), velocity=(6,6)):
@@ -11,24 +49,32 @@ class BouncingBall:
         self.vx, self.vy = velocity
         self.x = self.width // 2
         self.y = self.height // 2
+        self._bounce = _BounceState(
+            self.x, self.y, self.vx, self.vy,
+            (radius, self.width - radius), (radius, self.height - radius))
+        self._t = 0
+        # Persistent canvas: the background is static, so instead of
+        # allocating and clearing a full frame every call we only erase the
+        # previous ball's rect and redraw — O(r^2) work instead of O(H*W).
+        self._canvas = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self._prev_rect = None
 
     def next_frame(self):
-        # Update position
-        self.x += self.vx
-        self.y += self.vy
-        
-        # Bounce
-        if self.x - self.radius <= 0 or self.x + self.radius >= self.width:
-            self.vx *= -1
-            self.x = max(self.radius, min(self.x, self.width - self.radius))
-        if self.y - self.radius <= 0 or self.y + self.radius >= self.height:
-            self.vy *= -1
-            self.y = max(self.radius, min(self.y, self.height - self.radius))
-            
-        # Draw
-        frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-        cv2.circle(frame, (self.x, self.y), self.radius, self.color, -1)
-        return frame
+        # Position comes straight from the closed-form trajectory.
+        self._t += 1
+        self.x, self.y = self._bounce.position(self._t)
+
+        # Erase old ball, draw new one
+        if self._prev_rect is not None:
+            x1, y1, x2, y2 = self._prev_rect
+            self._canvas[y1:y2, x1:x2] = 0
+        cv2.circle(self._canvas, (self.x, self.y), self.radius, self.color, -1)
+        r = self.radius + 1
+        self._prev_rect = (
+            max(0, self.x - r), max(0, self.y - r),
+            min(self.width, self.x + r), min(self.height, self.y + r),
+        )
+        return self._canvas
 
 class BoxWithText:
     """Simple state holder for box animation."""
@@ -39,25 +85,43 @@ class BoxWithText:
         self.vx, self.vy = velocity
         self.x = (self.width - self.box_w) // 2
         self.y = (self.height - self.box_h) // 2
+        self._bounce = _BounceState(
+            self.x, self.y, self.vx, self.vy,
+            (0, self.width - self.box_w), (0, self.height - self.box_h))
+        self._t = 0
+        # The text and scale never change, so measure it once here rather
+        # than calling getTextSize per frame.
+        self._font = cv2.FONT_HERSHEY_SIMPLEX
+        self._text_scale = 0.5
+        (self._text_w, self._text_h), _ = cv2.getTextSize(
+            self.text, self._font, self._text_scale, 1)
+        # Double-buffered persistent canvases: per frame we only erase where
+        # the box sat last time this buffer was used and redraw, instead of
+        # allocating and memset-ing a full H*W*3 frame. Alternating buffers
+        # keeps the frame a downstream consumer still holds from being
+        # overdrawn mid-read.
+        self._buffers = [
+            np.zeros((self.height, self.width, 3), dtype=np.uint8)
+            for _ in range(2)
+        ]
+        self._prev_rects = [None, None]
+        self._frame_count = 0
 
     def next_frame(self):
-        self.x += self.vx
-        self.y += self.vy
-        
-        if self.x <= 0 or self.x + self.box_w >= self.width:
-            self.vx *= -1
-            self.x = max(0, min(self.x, self.width - self.box_w))
-        if self.y <= 0 or self.y + self.box_h >= self.height:
-            self.vy *= -1
-            self.y = max(0, min(self.y, self.height - self.box_h))
-            
-        frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self._t += 1
+        self.x, self.y = self._bounce.position(self._t)
+
+        idx = self._frame_count & 1
+        self._frame_count += 1
+        frame = self._buffers[idx]
+        if self._prev_rects[idx] is not None:
+            x1, y1, x2, y2 = self._prev_rects[idx]
+            frame[y1:y2, x1:x2] = 0
+        self._prev_rects[idx] = (self.x, self.y,
+                                 self.x + self.box_w + 1, self.y + self.box_h + 1)
+
         cv2.rectangle(frame, (self.x, self.y), (self.x + self.box_w, self.y + self.box_h), (255, 255, 255), -1)
-        
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        text_scale = 0.5
-        (text_w, text_h), _ = cv2.getTextSize(self.text, font, text_scale, 1)
-        text_x = self.x + (self.box_w - text_w) // 2
-        text_y = self.y + (self.box_h + text_h) // 2
-        cv2.putText(frame, self.text, (text_x, text_y), font, text_scale, (0, 0, 0), 1, cv2.LINE_AA)
+        text_x = self.x + (self.box_w - self._text_w) // 2
+        text_y = self.y + (self.box_h + self._text_h) // 2
+        cv2.putText(frame, self.text, (text_x, text_y), self._font, self._text_scale, (0, 0, 0), 1, cv2.LINE_AA)
         return frame
@@ -1,30 +1,64 @@
+import os
+
 import cv2
 import numpy as np
 
-def detect_motion(image: np.ndarray, previous_gray: np.ndarray = None, threshold: int = 25, min_area: int = 500, max_area: int = None, blur_size: int = 21):
-    """
-    Detects motion in an image compared to a previous frame.
-    Returns: (processed_image, motion_detected_bool, current_gray)
-    """
-    if image is None:
-        return image, False, previous_gray
+from dustycam.nodes import _bufpool
 
-    
-        
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    gray = cv2.GaussianBlur(gray, (blur_size, blur_size), 0)
-    
-    if previous_gray is None:
-        return image, False, gray
-        
-    frame_delta = cv2.absdiff(previous_gray, gray)
-    
-    thresh = cv2.threshold(frame_delta, threshold, 255, cv2.THRESH_BINARY)[1]
-    thresh = cv2.dilate(thresh, None, iterations=2)
-    contours, _ = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
-    image_with_detections = image.copy()
+# Opt into OpenCV's T-API (OpenCL) with DUSTYCAM_OPENCL=1: cvtColor, blur,
+# absdiff, threshold and dilate then run on the GPU/iGPU when frames are
+# wrapped in cv2.UMat, freeing CPU cores for inference and encoding.
+_USE_OPENCL = False
+if os.environ.get("DUSTYCAM_OPENCL", "0") == "1":
+    try:
+        _USE_OPENCL = cv2.ocl.haveOpenCL()
+        cv2.ocl.setUseOpenCL(_USE_OPENCL)
+    except Exception:
+        _USE_OPENCL = False
 
+# One 5x5 dilate pass has the same footprint as the two 3x3 passes we used
+# to run (dilate with kernel=None rebuilds a 3x3 element per iteration) but
+# sweeps the frame once instead of twice.
+_DILATE_K = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+
+# Numba is optional; with it the two absdiffs, the AND, the threshold and
+# the per-tile motion counts fuse into one specialized pass over the three
+# gray frames (the JIT specializes on the uint8 dtype and fixed shape at
+# first call), replacing four full-frame OpenCV sweeps plus the integral.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, boundscheck=False, cache=True)
+    def _fused_motion_mask(g0, g1, g2, threshold, block, mask, counts):
+        h, w = g0.shape
+        for ty in prange(counts.shape[0]):
+            for tx in range(counts.shape[1]):
+                counts[ty, tx] = 0
+            y_end = min(h, (ty + 1) * block)
+            for y in range(ty * block, y_end):
+                for x in range(w):
+                    d1 = abs(int(g0[y, x]) - int(g1[y, x]))
+                    d2 = abs(int(g1[y, x]) - int(g2[y, x]))
+                    if (d1 & d2) > threshold:
+                        mask[y, x] = 255
+                        counts[ty, x // block] += 1
+                    else:
+                        mask[y, x] = 0
+else:
+    _fused_motion_mask = None
+
+def _annotate_contours(image, contours, min_area, max_area, inv_scale=1.0):
+    """
+    Draw boxes for contours inside the area band. Returns (annotated, bool).
+    `inv_scale` maps contour coordinates (found on a downscaled mask) back
+    onto the full-resolution image.
+    """
+    # Defer the H*W*3 copy until a contour actually qualifies; frames whose
+    # contours all fall outside the area band return the input unchanged.
+    image_with_detections = None
     motion_detected = False
     for c in contours:
         area = cv2.contourArea(c)
@@ -34,11 +68,226 @@ def detect_motion(image: np.ndarray, previous_gray: np.ndarray = None, threshold
             continue
 
         motion_detected = True
+        if image_with_detections is None:
+            image_with_detections = image.copy()
         (x, y, w, h) = cv2.boundingRect(c)
+        if inv_scale != 1.0:
+            x, y = int(x * inv_scale), int(y * inv_scale)
+            w, h = int(w * inv_scale), int(h * inv_scale)
         cv2.rectangle(image_with_detections, (x, y), (x + w, y + h), (0, 0, 255), 2)
-    
+
     if motion_detected:
         cv2.putText(image_with_detections, "Motion Detected", (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
-        
+        return image_with_detections, True
+
+    return image, False
+
+
+def detect_motion(image: np.ndarray, previous_gray: np.ndarray = None, threshold: int = 25, min_area: int = 500, max_area: int = None, blur_size: int = 21):
+    """
+    Detects motion in an image compared to a previous frame.
+    Returns: (processed_image, motion_detected_bool, current_gray)
+    """
+    if image is None:
+        return image, False, previous_gray
+
+
+
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    # Box blur instead of Gaussian: noise suppression is all we need, and
+    # cv2.blur's sliding-window implementation is O(1) per pixel regardless
+    # of kernel size vs ~2*k multiply-adds for the separable Gaussian.
+    gray = cv2.blur(gray, (blur_size, blur_size))
+
+    if previous_gray is None:
+        return image, False, gray
+
+    frame_delta = cv2.absdiff(previous_gray, gray)
+
+    # Threshold into a thread-local pooled buffer: a module-level global
+    # here would be shared between pipelines running on different threads.
+    thresh_buf = _bufpool.acquire(frame_delta.shape, np.uint8)
+    _, thresh = cv2.threshold(frame_delta, threshold, 255, cv2.THRESH_BINARY, dst=thresh_buf)
+    thresh = cv2.dilate(thresh, _DILATE_K, iterations=1)
+    _bufpool.release(thresh_buf)
+    # findContours hasn't mutated its input since OpenCV 3, so no copy needed.
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    image_with_detections, motion_detected = _annotate_contours(image, contours, min_area, max_area)
     return image_with_detections, motion_detected, gray
 
+
+class MotionDetector:
+    """
+    Stateful three-frame temporal-difference motion detector.
+
+    Keeps the last three blurred grayscale frames in a ring of reused
+    buffers (no per-frame allocation) and ANDs the two successive frame
+    deltas, which suppresses the "ghost" boxes two-frame differencing
+    produces when an object stops or the exposure shifts. Before running
+    findContours it sums the motion mask over BLOCK x BLOCK tiles via one
+    integral image; when no tile has enough motion pixels the frame is
+    declared still and the contour scan is skipped entirely — the common
+    case on a mostly static scene.
+    """
+
+    BLOCK = 16
+
+    def __init__(self):
+        self._ring = [None, None, None]
+        self._ring_shape = None
+        self._frames = 0
+        self._delta_buf = None
+        self._thresh_buf = None
+        self._mask_buf = None
+        self._tile_counts = None
+        self._small_buf = None
+
+    def detect(self, image: np.ndarray, threshold: int = 25, min_area: int = 500,
+               max_area: int = None, blur_size: int = 21, scale: float = 0.25):
+        """
+        Run detection on the next frame.
+        Returns: (processed_image, motion_detected_bool)
+        """
+        if image is None:
+            return image, False
+
+        # Motion only needs coarse localization, so the whole chain runs on
+        # a downscaled frame: every pass below touches scale^2 as many
+        # pixels. Area thresholds and the blur kernel shrink to match, and
+        # boxes are mapped back to full resolution when drawn.
+        if scale != 1.0:
+            h, w = image.shape[:2]
+            dsize = (int(w * scale), int(h * scale))
+            # Downscale into a reused buffer so the hot path allocates no
+            # new small frame per tick.
+            if (self._small_buf is None
+                    or self._small_buf.shape[:2] != (dsize[1], dsize[0])):
+                if self._small_buf is not None:
+                    _bufpool.release(self._small_buf)
+                self._small_buf = _bufpool.acquire(
+                    (dsize[1], dsize[0], image.shape[2]), image.dtype)
+            small = cv2.resize(image, dsize, dst=self._small_buf,
+                               interpolation=cv2.INTER_AREA)
+            blur_size = max(3, int(blur_size * scale)) | 1
+            min_area = max(1, int(min_area * scale * scale))
+            if max_area is not None:
+                max_area = max(1, int(max_area * scale * scale))
+        else:
+            small = image
+
+        if self._ring_shape != small.shape[:2]:
+            # Resolution changed (or first frame); restart the ring and
+            # hand the old working buffers back to the pool.
+            for buf in (*self._ring, self._delta_buf, self._thresh_buf, self._mask_buf):
+                if isinstance(buf, np.ndarray):
+                    _bufpool.release(buf)
+            self._ring = [None, None, None]
+            self._delta_buf = self._thresh_buf = self._mask_buf = None
+            self._ring_shape = small.shape[:2]
+            self._frames = 0
+
+        if _USE_OPENCL:
+            mask = self._motion_mask_ocl(small, threshold, blur_size)
+        else:
+            mask = self._motion_mask(small, threshold, blur_size)
+        if mask is None:
+            return image, False
+
+        if not self._block_motion(mask, min_area):
+            return image, False
+
+        # Dilate only frames that passed the gate: on a still scene (the
+        # common case) the full-frame morphology never runs at all.
+        mask = cv2.dilate(mask, _DILATE_K, dst=mask)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return _annotate_contours(image, contours, min_area, max_area,
+                                  inv_scale=1.0 / scale)
+
+    def _motion_mask(self, small, threshold, blur_size):
+        """CPU path: convert + blur into reused ring buffers, then diff."""
+        slot = self._frames % 3
+        gray = self._ring[slot]
+        if gray is None:
+            gray = _bufpool.acquire(small.shape[:2], np.uint8)
+            self._ring[slot] = gray
+        cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=gray)
+        # Box blur: O(1) per pixel sliding window, plenty for noise suppression.
+        cv2.blur(gray, (blur_size, blur_size), dst=gray)
+        self._frames += 1
+
+        if self._frames < 3:
+            return None
+
+        g_prev = self._ring[(slot - 1) % 3]
+        g_prev2 = self._ring[(slot - 2) % 3]
+
+        if _fused_motion_mask is not None:
+            k = self.BLOCK
+            h, w = gray.shape
+            tiles = ((h + k - 1) // k, (w + k - 1) // k)
+            if self._mask_buf is None or self._mask_buf.shape != gray.shape:
+                self._mask_buf = _bufpool.acquire(gray.shape, np.uint8)
+                self._tile_counts = np.empty(tiles, np.int32)
+            _fused_motion_mask(gray, g_prev, g_prev2, threshold, k,
+                               self._mask_buf, self._tile_counts)
+            return self._mask_buf
+
+        self._tile_counts = None
+        if self._delta_buf is None or self._delta_buf.shape != gray.shape:
+            self._delta_buf = _bufpool.acquire(gray.shape, np.uint8)
+            self._thresh_buf = _bufpool.acquire(gray.shape, np.uint8)
+
+        # Motion must appear in BOTH consecutive deltas to count.
+        d1 = cv2.absdiff(gray, g_prev, dst=self._delta_buf)
+        d2 = cv2.absdiff(g_prev, g_prev2)
+        mask = cv2.bitwise_and(d1, d2, dst=d1)
+        _, mask = cv2.threshold(mask, threshold, 255, cv2.THRESH_BINARY, dst=self._thresh_buf)
+        return mask
+
+    def _motion_mask_ocl(self, small, threshold, blur_size):
+        """
+        OpenCL path: the ring holds UMats so cvtColor/blur/absdiff/threshold
+        all dispatch to the GPU; only the final mask is downloaded (for the
+        tile gate, and the dilate + findContours that run on motion frames).
+        """
+        self._tile_counts = None
+        slot = self._frames % 3
+        gray = cv2.cvtColor(cv2.UMat(small), cv2.COLOR_BGR2GRAY)
+        gray = cv2.blur(gray, (blur_size, blur_size))
+        self._ring[slot] = gray
+        self._frames += 1
+
+        if self._frames < 3:
+            return None
+
+        g_prev = self._ring[(slot - 1) % 3]
+        g_prev2 = self._ring[(slot - 2) % 3]
+        d1 = cv2.absdiff(gray, g_prev)
+        d2 = cv2.absdiff(g_prev, g_prev2)
+        mask = cv2.bitwise_and(d1, d2)
+        _, mask = cv2.threshold(mask, threshold, 255, cv2.THRESH_BINARY)
+        return mask.get()
+
+    def _block_motion(self, mask: np.ndarray, min_area: int) -> bool:
+        """True if any BLOCK x BLOCK tile holds enough motion pixels."""
+        k = self.BLOCK
+        if self._tile_counts is not None:
+            # The fused kernel already counted motion pixels per tile.
+            tau = min(min_area, (k * k) // 4)
+            return bool(self._tile_counts.max() >= tau)
+        h, w = mask.shape
+        ny, nx = h // k, w // k
+        if ny == 0 or nx == 0:
+            return cv2.countNonZero(mask) > 0
+        ii = cv2.integral(mask)
+        # Each tile's pixel sum from four integral-image corners, all tiles
+        # at once via strided slices.
+        sums = (ii[k:ny * k + 1:k, k:nx * k + 1:k]
+                - ii[0:ny * k:k, k:nx * k + 1:k]
+                - ii[k:ny * k + 1:k, 0:nx * k:k]
+                + ii[0:ny * k:k, 0:nx * k:k])
+        # A real motion region of min_area pixels puts at least a quarter of
+        # a tile's worth of set pixels in some tile it overlaps.
+        tau = 255 * min(min_area, (k * k) // 4)
+        return bool(sums.max() >= tau)
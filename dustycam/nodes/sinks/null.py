@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from dustycam.frame import FramePacket
+from dustycam.node import SinkNode
+
+
+class NullSink(SinkNode):
+    """Discards packets. Useful as a chain terminator in tests and benchmarks."""
+
+    def consume(self, packet: FramePacket) -> None:
+        pass
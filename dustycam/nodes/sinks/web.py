@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+import cv2
+
+from dustycam.frame import FramePacket
+from dustycam.node import SinkNode
+
+# PyTurboJPEG (libjpeg-turbo's SIMD encoder) is optional; it is several
+# times faster than cv2.imencode's baseline libjpeg path and returns bytes
+# directly, skipping the .tobytes() copy. We fall back to OpenCV without it.
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _turbo = TurboJPEG()
+except Exception:
+    _turbo = None
+
+
+class WebSink(SinkNode):
+    """
+    Encodes incoming frames to JPEG and keeps the latest encoded frame for
+    the webapp to serve. Streaming consumers register with `add_client()` /
+    `remove_client()` and wait on `condition` for new frames; while no
+    client is attached, `consume` skips encoding entirely.
+
+    Encoding runs on a dedicated daemon thread fed through a single-slot
+    mailbox: `consume` just drops the newest frame in and returns, so a
+    slow encode (or slow client) never stalls the pipeline thread — stale
+    frames are overwritten rather than queued.
+    """
+
+    def __init__(self, quality: int = 80):
+        super().__init__(name="WebSink")
+        self.quality = quality
+        self.latest: Optional[bytes] = None
+        self.condition = threading.Condition()
+        # Monotonic count of encoded frames; stream loops can compare it
+        # against what they've sent to notice they are lagging.
+        self.frame_count = 0
+        self._clients = 0
+        self._mailbox = None
+        self._mailbox_lock = threading.Lock()
+        self._frame_ready = threading.Event()
+        self._stopping = False
+        self._encoder = threading.Thread(target=self._encode_loop, daemon=True)
+        self._encoder.start()
+
+    def add_client(self) -> None:
+        with self.condition:
+            self._clients += 1
+
+    def remove_client(self) -> None:
+        with self.condition:
+            self._clients = max(0, self._clients - 1)
+
+    def _encode(self, image) -> Optional[bytes]:
+        if _turbo is not None:
+            try:
+                return _turbo.encode(image, quality=self.quality,
+                                     pixel_format=TJPF_BGR)
+            except Exception:
+                pass
+        ok, jpeg = cv2.imencode(
+            '.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return jpeg.tobytes() if ok else None
+
+    def _encode_loop(self) -> None:
+        while not self._stopping:
+            if not self._frame_ready.wait(timeout=0.5):
+                continue
+            with self._mailbox_lock:
+                image, self._mailbox = self._mailbox, None
+                self._frame_ready.clear()
+            if image is None:
+                continue
+            data = self._encode(image)
+            if data is None:
+                continue
+            with self.condition:
+                self.latest = data
+                self.frame_count += 1
+                self.condition.notify_all()
+
+    def consume(self, packet: FramePacket) -> None:
+        if self._clients == 0:
+            # Nobody is watching; don't burn CPU encoding frames.
+            return
+        if packet.jpeg_bytes is not None:
+            # Camera already delivered JPEG; publish as-is, no re-encode.
+            with self.condition:
+                self.latest = packet.jpeg_bytes
+                self.frame_count += 1
+                self.condition.notify_all()
+            return
+        if packet.image is None:
+            return
+        with self._mailbox_lock:
+            self._mailbox = packet.image
+            self._frame_ready.set()
+
+    def get_last_frame_bytes(self) -> Optional[bytes]:
+        return self.latest
+
+    def close(self) -> None:
+        self._stopping = True
+        self._frame_ready.set()
+        self._encoder.join(timeout=2.0)
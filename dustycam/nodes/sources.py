@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from dustycam.frame import FramePacket
+from dustycam.node import SourceNode
+from dustycam.nodes import camera_sources, file_sources
+
+
+class FileSource(SourceNode):
+    """
+    Packet-producing file reader.
+    Images are decoded on a background thread into a bounded queue so disk
+    I/O and JPEG decode overlap with downstream work (e.g. inference) instead
+    of running in lockstep with it.
+    """
+
+    def __init__(self, directory: Path | str, loop: bool = False, prefetch: int = 4):
+        super().__init__(name="FileSource")
+        self._reader = file_sources.FileSource(directory, loop=loop)
+        self._frame_id = 0
+        self._queue: "queue.Queue[Optional[np.ndarray]]" = queue.Queue(maxsize=max(1, prefetch))
+        self._thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+        self._thread.start()
+
+    def _prefetch_loop(self):
+        while True:
+            frame = self._reader.read()
+            self._queue.put(frame)
+            if frame is None:
+                # End of (non-looping) directory.
+                break
+
+    def next_packet(self) -> Optional[FramePacket]:
+        frame = self._queue.get()
+        if frame is None:
+            return None
+        packet = FramePacket(frame_id=self._frame_id, timestamp=time.perf_counter_ns(), image=frame)
+        self._frame_id += 1
+        return packet
+
+    def close(self):
+        self._reader.close()
+
+
+class CameraSource(SourceNode):
+    """Packet-producing wrapper around a camera reader (read()/close())."""
+
+    def __init__(self, reader, name: str = "CameraSource"):
+        super().__init__(name=name)
+        self._reader = reader
+        self._frame_id = 0
+        # Cameras that expose read_jpeg() (Picamera2 in jpeg_stream mode)
+        # ship their native JPEG on the packet so streaming sinks skip
+        # re-encoding.
+        self._jpeg_reader = getattr(reader, "read_jpeg", None)
+
+    def next_packet(self) -> Optional[FramePacket]:
+        frame = self._reader.read()
+        if frame is None:
+            return None
+        packet = FramePacket(frame_id=self._frame_id, timestamp=time.perf_counter_ns(), image=frame)
+        if self._jpeg_reader is not None:
+            packet.jpeg_bytes = self._jpeg_reader()
+        self._frame_id += 1
+        return packet
+
+    def next_packet_blocking(self, timeout: float = 0.1) -> Optional[FramePacket]:
+        # Readers with a frame event (Picamera2Source) park the thread until
+        # the camera callback fires, waking within one frame interval.
+        wait = getattr(self._reader, "wait_frame", None)
+        if wait is not None:
+            wait(timeout)
+            return self.next_packet()
+        return super().next_packet_blocking(timeout)
+
+    def take_photo(self) -> Optional[np.ndarray]:
+        if hasattr(self._reader, "take_photo"):
+            return self._reader.take_photo()
+        return None
+
+    def close(self):
+        self._reader.close()
+
+
+def create_source(preferred: str = None, file_dir: Path | str = None,
+                  camera_index: int = 0) -> SourceNode:
+    """
+    Build the best available source.
+    `preferred="file"` (or a `file_dir`) gives a FileSource; otherwise try
+    Picamera2, then fall back to an OpenCV webcam.
+    """
+    if preferred == "file" or (preferred is None and file_dir is not None):
+        if file_dir is None:
+            raise ValueError("file_dir is required for a file source")
+        return FileSource(directory=file_dir)
+
+    try:
+        return CameraSource(camera_sources.Picamera2Source(), name="Picamera2Source")
+    except Exception:
+        pass
+
+    return CameraSource(camera_sources.OpenCVSource(camera_index), name="OpenCVSource")
@@ -14,54 +14,211 @@ def _is_raspberry_pi() -> bool:
     machine = platform.machine().lower()
     return machine.startswith("arm") or machine.startswith("aarch64")
 
-def load_yolo_model(model_name: str = "yolov8n") -> Any:
-    """Loads and returns the model object."""
+def _cuda_available() -> bool:
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except Exception:
+        return False
+
+
+# Directory of representative frames used for INT8 entropy calibration
+CALIBRATION_DIR = "data/calibration"
+
+
+def _edgetpu_available() -> bool:
+    """True when the Coral Edge TPU runtime and a device are usable."""
+    try:
+        from tflite_runtime.interpreter import load_delegate
+        load_delegate('libedgetpu.so.1')
+        return True
+    except Exception:
+        return False
+
+
+def _prefer_edgetpu(model_file: str) -> str:
+    """
+    Swap in the *_edgetpu.tflite variant of a TFLite model when one sits
+    next to it and the Coral runtime is present. Ultralytics' AutoBackend
+    recognizes the suffix and attaches the Edge TPU delegate, so int8 ops
+    run on the accelerator instead of the CPU interpreter.
+    """
+    if model_file.endswith('.tflite') and not model_file.endswith('_edgetpu.tflite'):
+        candidate = model_file[:-len('.tflite')] + '_edgetpu.tflite'
+        if os.path.exists(candidate) and _edgetpu_available():
+            logger.info(f"Edge TPU present; using {candidate}.")
+            return candidate
+    return model_file
+
+
+def _get_tensorrt_engine(model_file: str, batch: int, imgsz: int,
+                         precision: str = "fp16") -> Optional[str]:
+    """
+    Export the model to a TensorRT engine (once) and return the cached path.
+    Engines are GPU-specific, so the cache key includes the device name.
+    INT8 needs calibration images in CALIBRATION_DIR; without them we drop
+    back to FP16 rather than exporting an uncalibrated engine.
+    """
+    import torch
     from ultralytics import YOLO
-    if _is_raspberry_pi():
-        # TODO: TFLite implementation
-        logger.warning("Raspberry Pi detected. TFLite backend not implemented yet. Falling back to Ultralytics (slow).")
 
+    export_kwargs = dict(format="engine", dynamic=True, batch=batch, imgsz=imgsz)
+    if precision == "int8":
+        if os.path.isdir(CALIBRATION_DIR):
+            export_kwargs.update(int8=True, data=CALIBRATION_DIR)
+        else:
+            logger.warning(
+                f"No calibration images in {CALIBRATION_DIR}; using FP16 instead of INT8."
+            )
+            precision = "fp16"
+    if precision == "fp16":
+        export_kwargs["half"] = True
+
+    gpu_name = torch.cuda.get_device_name(0).replace(" ", "_")
+    model_stem = os.path.splitext(os.path.basename(model_file))[0]
+    cache_dir = os.path.expanduser("~/.cache/dustycam")
+    engine_path = os.path.join(
+        cache_dir, f"{model_stem}_{gpu_name}_b{batch}_{imgsz}_{precision}.engine"
+    )
+
+    if os.path.exists(engine_path):
+        return engine_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    logger.info(f"Exporting {model_file} to TensorRT {precision.upper()} engine (one-time)...")
+    exported = YOLO(model_file).export(**export_kwargs)
+    os.replace(exported, engine_path)
+    logger.info(f"TensorRT engine cached at {engine_path}")
+    return engine_path
+
+
+def _get_tflite_model(model_file: str, imgsz: int) -> Optional[str]:
+    """
+    Export the model once to an int8 TFLite artifact and return the cached
+    path. int8 NEON kernels are ~4x faster than FP32 on ARM, and the .tflite
+    file is what Coral/Hailo-style delegates expect. Calibration uses frames
+    from CALIBRATION_DIR when present.
+    """
+    from ultralytics import YOLO
+
+    model_stem = os.path.splitext(os.path.basename(model_file))[0]
+    cache_dir = os.path.expanduser("~/.cache/dustycam")
+    tflite_path = os.path.join(cache_dir, f"{model_stem}_{imgsz}_int8.tflite")
+    if os.path.exists(tflite_path):
+        return tflite_path
+
+    export_kwargs = dict(format="tflite", int8=True, imgsz=imgsz)
+    if os.path.isdir(CALIBRATION_DIR):
+        export_kwargs["data"] = CALIBRATION_DIR
+
+    os.makedirs(cache_dir, exist_ok=True)
+    logger.info(f"Exporting {model_file} to int8 TFLite (one-time)...")
+    exported = YOLO(model_file).export(**export_kwargs)
+    os.replace(exported, tflite_path)
+    logger.info(f"TFLite model cached at {tflite_path}")
+    return tflite_path
+
+
+def load_yolo_model(model_name: str = "yolov8n", batch: int = 1, imgsz: int = 640,
+                    precision: str = "fp16") -> Any:
+    """
+    Loads and returns the model object.
+    On CUDA machines, .pt checkpoints are exported once to a TensorRT engine
+    (fused kernels, tensor cores) at the requested precision — "fp32",
+    "fp16" (default) or "int8" (entropy-calibrated against frames in
+    data/calibration, falling back to fp16 when absent). On a Raspberry Pi
+    they are exported once to int8 TFLite instead. Exports are cached under
+    ~/.cache/dustycam. Passing a .onnx or .tflite file directly loads it
+    through Ultralytics' AutoBackend, which routes to onnxruntime /
+    tflite_runtime (including the Edge TPU delegate for *_edgetpu.tflite)
+    while keeping the same predict interface.
+    """
+    from ultralytics import YOLO
 
     try:
-        if model_name.endswith('.tflite') or model_name.endswith('.pt'):
+        if (model_name.endswith(('.tflite', '.pt', '.onnx', '.engine'))
+                or os.path.isdir(model_name)):
+            # Directory form covers exported OpenVINO models
+            # (*_openvino_model/), which AutoBackend loads by path.
             model_file = model_name
         else:
             model_file = f"{model_name}.pt"
 
+        if model_file.endswith('.pt') and _cuda_available():
+            try:
+                engine_path = _get_tensorrt_engine(model_file, batch, imgsz, precision)
+                if engine_path:
+                    logger.info(f"Loading TensorRT engine {engine_path}...")
+                    return YOLO(engine_path)
+            except Exception as e:
+                logger.warning(f"TensorRT export failed ({e}); falling back to PyTorch.")
 
+        if model_file.endswith('.pt') and _is_raspberry_pi():
+            try:
+                tflite_path = _get_tflite_model(model_file, imgsz)
+                if tflite_path:
+                    tflite_path = _prefer_edgetpu(tflite_path)
+                    logger.info(f"Loading int8 TFLite model {tflite_path}...")
+                    return YOLO(tflite_path)
+            except Exception as e:
+                logger.warning(f"TFLite export failed ({e}); falling back to FP32 PyTorch (slow).")
+
+        model_file = _prefer_edgetpu(model_file)
         logger.info(f"Loading YOLO model {model_file}...")
         return YOLO(model_file)
     except ImportError:
         logger.error("Ultralytics not installed.")
         return None
 
+def detect_objects_batch(images: List[np.ndarray], model: Any, confidence: float = 0.5,
+                         imgsz: int = 640) -> List[List[Dict]]:
+    """
+    Runs detection on a batch of images with a single model call, which
+    amortizes kernel-launch and dispatch overhead across the batch.
+    Returns one detection list per input image, each a list of dicts:
+    {'bbox': (x1,y1,x2,y2), 'conf': float, 'label': str, 'cls': int}
+    """
+    if model is None or not images:
+        return [[] for _ in images]
+
+    # Check if it's ultralytics model (basic check)
+    if not (hasattr(model, 'names') and hasattr(model, 'predict')):
+        return [[] for _ in images]
+
+    # Explicit batch= sizes the forward pass for the whole group up front
+    # instead of letting the backend pick a per-image default.
+    results = model(images, verbose=False, conf=confidence, imgsz=imgsz,
+                    batch=len(images))
+    names = model.names
+    all_detections: List[List[Dict]] = []
+    for result in results:
+        detections: List[Dict] = []
+        boxes = result.boxes
+        if boxes is not None and len(boxes) > 0:
+            # One bulk GPU->CPU transfer per result instead of per box.
+            xyxy = boxes.xyxy.cpu().numpy().astype(np.int32)
+            confs = boxes.conf.cpu().numpy()
+            classes = boxes.cls.cpu().numpy().astype(np.int32)
+            detections = [
+                {
+                    'bbox': tuple(xyxy[i]),
+                    'conf': float(confs[i]),
+                    'cls': int(classes[i]),
+                    'label': names[int(classes[i])],
+                }
+                for i in range(len(confs))
+            ]
+        all_detections.append(detections)
+    return all_detections
+
+
 def detect_objects(image: np.ndarray, model: Any, confidence: float = 0.5, imgsz: int = 640) -> List[Dict]:
     """
-    Runs detection on image.
+    Runs detection on a single image.
     Returns list of dicts: {'bbox': (x1,y1,x2,y2), 'conf': float, 'label': str, 'cls': int}
+    Callers with several frames in hand should prefer detect_objects_batch.
     """
     if model is None or image is None:
         return []
-
-    # Check if it's ultralytics model (basic check)
-    if hasattr(model, 'names') and hasattr(model, 'predict'):
-        results = model(image, verbose=False, conf=confidence, imgsz=imgsz)
-        detections = []
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                coords = box.xyxy[0].cpu().numpy().astype(int)
-                conf = box.conf.item()
-                cls_id = int(box.cls.item())
-                label = model.names[cls_id]
-                
-                detections.append({
-                    'bbox': tuple(coords),
-                    'conf': conf,
-                    'cls': cls_id,
-                    'label': label
-                })
-        return detections
-        
-    return []
+    return detect_objects_batch([image], model, confidence=confidence, imgsz=imgsz)[0]
 
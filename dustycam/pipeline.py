@@ -3,14 +3,103 @@ import threading
 import traceback
 import json
 import os
+from contextlib import contextmanager
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, Type, Tuple
 from collections import deque
 
+import numpy as np
 
-from ultralytics import YOLO
+try:
+    from ultralytics import YOLO
+except ImportError:
+    YOLO = None
 
+# orjson parses and serializes several times faster than stdlib json and
+# works in bytes, skipping text-mode encoding; settings files are small but
+# the save path is hit on every (coalesced) settings update and at startup.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+
+class _MetricRing:
+    """
+    Fixed-size ring of monotonic nanosecond timestamps for sliding-window
+    event counts. Recording is one array store (no per-event PyFloat or
+    deque node), and the 1-minute count is a searchsorted over the already
+    sorted window instead of a pop loop every frame.
+    """
+
+    def __init__(self, size: int = 4096):
+        self._buf = np.empty(size, dtype=np.int64)
+        self._head = 0
+        self._count = 0
+
+    def record(self, now_ns: int):
+        n = len(self._buf)
+        self._buf[(self._head + self._count) % n] = now_ns
+        if self._count == n:
+            self._head = (self._head + 1) % n  # overwrite the oldest
+        else:
+            self._count += 1
+
+    def count_since(self, cutoff_ns: int) -> int:
+        n, h, c = len(self._buf), self._head, self._count
+        if c == 0:
+            return 0
+        end = h + c
+        if end <= n:
+            window = self._buf[h:end]
+            return int(c - np.searchsorted(window, cutoff_ns))
+        # Wrapped: the window is two sorted slices.
+        first = self._buf[h:]
+        second = self._buf[:end - n]
+        kept = (len(first) - np.searchsorted(first, cutoff_ns)
+                + len(second) - np.searchsorted(second, cutoff_ns))
+        return int(kept)
+
+
+class _AsyncImageWriter:
+    """
+    Writes frames to disk off the pipeline thread.
+    `save` just queues the frame; JPEG encoding and the file write happen on
+    worker threads, so a motion-event burst of saves no longer blocks the
+    capture loop on SD-card latency. Writes for one event land in submit
+    order per worker, and close() drains everything that was queued.
+    """
+
+    def __init__(self, max_workers: int = 2, quality: int = 85):
+        from concurrent.futures import ThreadPoolExecutor
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="img-writer")
+        self.quality = quality
+
+    def save(self, path, image):
+        self._pool.submit(self._write, str(path), image, self.quality)
+
+    @staticmethod
+    def _write(path, image, quality):
+        import cv2
+        try:
+            ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                return
+            # os.write takes the encode buffer directly (no tobytes copy)
+            # and skips the BufferedWriter layer a file object would add.
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, buf)
+            finally:
+                os.close(fd)
+        except Exception as e:
+            print(f"Error writing {path}: {e}")
+
+    def close(self):
+        self._pool.shutdown(wait=True)
 
 
 class Pipeline:
@@ -42,6 +131,14 @@ class Pipeline:
         self._thread: Optional[threading.Thread] = None
         self._lock = threading.Lock()
 
+        # Settings writes are coalesced: update_settings just marks dirty
+        # and a background flusher persists at most ~twice a second, so a
+        # stream of UI slider events doesn't rewrite the JSON file per tick.
+        self._settings_dirty = threading.Event()
+        self._settings_batching = False
+        threading.Thread(target=self._settings_flusher, daemon=True,
+                         name=f"{self.name}-settings").start()
+
     def _load_settings(self) -> Any:
         """Load settings from disk if available, else return default model."""
         if not self.settings_model:
@@ -51,10 +148,11 @@ class Pipeline:
         
         if self.settings_file.exists():
             try:
-                with open(self.settings_file, 'r') as f:
-                    saved_data = json.load(f)
-                    # Validate and merge
-                    initial_settings = self.settings_model(**saved_data)
+                with open(self.settings_file, 'rb') as f:
+                    raw = f.read()
+                saved_data = orjson.loads(raw) if orjson else json.loads(raw)
+                # Validate and merge
+                initial_settings = self.settings_model(**saved_data)
                 print(f"Loaded settings for '{self.name}': {initial_settings.model_dump()}")
             except Exception as e:
                 print(f"Error loading settings for '{self.name}': {e}")
@@ -67,20 +165,53 @@ class Pipeline:
         return initial_settings
 
     def _save_settings(self, settings_to_save: Any = None):
-        """Save current (or provided) settings to disk."""
+        """Save current (or provided) settings to disk (atomic rename)."""
         try:
             target_settings = settings_to_save or self.settings
             self.settings_dir.mkdir(parents=True, exist_ok=True)
-            with open(self.settings_file, 'w') as f:
-                if isinstance(target_settings, BaseModel):
-                    # Pydantic model
-                    f.write(target_settings.model_dump_json(indent=4))
-                else:
-                    # Dict fallback
-                    json.dump(target_settings, f, indent=4)
+            # Write to a temp file and rename so a power cut mid-write
+            # can't leave a truncated settings file behind.
+            tmp_file = self.settings_file.with_suffix('.json.tmp')
+            if isinstance(target_settings, BaseModel):
+                data = target_settings.model_dump(mode='json')
+            else:
+                data = target_settings
+            if orjson:
+                payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(data, indent=4).encode('utf-8')
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_file, self.settings_file)
         except Exception as e:
             print(f"Error saving settings for '{self.name}': {e}")
 
+    def _settings_flusher(self):
+        while True:
+            self._settings_dirty.wait()
+            time.sleep(0.5)  # coalesce bursts of updates into one write
+            if self._settings_batching:
+                continue
+            self._settings_dirty.clear()
+            self._save_settings()
+
+    @contextmanager
+    def batch_settings(self):
+        """
+        Group several update_settings calls into a single disk write:
+
+            with pipeline.batch_settings():
+                pipeline.update_settings({...})
+                pipeline.update_settings({...})
+        """
+        self._settings_batching = True
+        try:
+            yield self
+        finally:
+            self._settings_batching = False
+            self._settings_dirty.clear()
+            self._save_settings()
+
     def update_settings(self, new_settings: Dict[str, Any], restart: bool = False):
         """
         Update settings and persist to disk.
@@ -93,6 +224,11 @@ class Pipeline:
                 current_data = self.settings.model_dump()
                 current_data.update(new_settings)
                 updated = self.settings_model.model_validate(current_data)
+                if updated == self.settings:
+                    # No-op update: skip the disk write, and skip the restart
+                    # below so an unchanged config can't trigger a model
+                    # reload and buffer reallocation.
+                    return
                 self.settings = updated
             except Exception as e:
                 print(f"Validation error updating settings: {e}")
@@ -100,10 +236,12 @@ class Pipeline:
                 return
         else:
             # Dict fallback
+            if all(self.settings.get(k) == v for k, v in new_settings.items()):
+                return
             self.settings.update(new_settings)
-            
-        self._save_settings()
-        
+
+        self._settings_dirty.set()
+
         if restart and self.running:
             print(f"Restarting pipeline '{self.name}' due to settings update...")
             self.stop()
@@ -130,6 +268,10 @@ class Pipeline:
         if self._thread:
             self._thread.join()
             self._thread = None
+        if self._settings_dirty.is_set():
+            # Don't lose a pending coalesced write on shutdown.
+            self._settings_dirty.clear()
+            self._save_settings()
         print(f"Pipeline '{self.name}' stopped.")
 
     def _worker(self):
@@ -173,58 +315,107 @@ class PiMotionPipeline(Pipeline):
         record_truck: bool = Field(True, json_schema_extra={"group": "Recording Filters"})
         record_bicycle: bool = Field(True, json_schema_extra={"group": "Recording Filters"})
 
+    # Base set of classes we care about (for 'Record All' or individual selection)
+    SUPPORTED_CLASSES = ('person', 'car', 'motorbike', 'bus', 'train', 'truck', 'bicycle')
 
     def __init__(self):
 
         super().__init__(name="pi_motion", settings_model=self.Settings)
 
         self.previews = {'Source': None, 'Detections': None}
+        self._recompute_targets()
+
+        # Status LED handle, owned by run_loop while it runs; driven from
+        # update_settings when enable_recording toggles rather than per frame.
+        self._status_led = None
+        # Mirrors the enable switch, maintained by GPIO edge callbacks.
+        self._gpio_active = False
 
         self.low_res_frame_buffer_size = 3
-        self.low_res_frame_buffer = deque(maxlen=self.low_res_frame_buffer_size)
+        # Holds (pool_slot, frame) pairs; frames live in a fixed pool of
+        # preallocated arrays managed in run_loop, so buffering a frame is a
+        # copy into a recycled slot rather than retaining a fresh allocation.
+        self.low_res_frame_buffer = deque()
 
-        # Metrics (Sliding window of timestamps)
+        # Metrics (Sliding window of timestamps in a fixed ring)
         self.metrics = {
-            'motion': deque(),
-            'recognition': deque(),
-            'recording': deque()
+            'motion': _MetricRing(),
+            'recognition': _MetricRing(),
+            'recording': _MetricRing()
         }
 
-    def _record_metric(self, name: str):
-        self.metrics[name].append(time.time())
+    def _recompute_targets(self):
+        """
+        Rebuild the active-label set. Settings only change through
+        update_settings, so the hot loop reads a cached frozenset instead of
+        walking seven booleans and a list per detection.
+        """
+        s = self.settings
+        if s.record_all:
+            self._targets = frozenset(self.SUPPORTED_CLASSES)
+        else:
+            self._targets = frozenset(
+                c for c in self.SUPPORTED_CLASSES if getattr(s, f"record_{c}"))
 
-    def _prune_metrics(self):
-        now = time.time()
-        for key in self.metrics:
-            d = self.metrics[key]
-            while len(d) > 0 and (now - d[0] > 60):
-                d.popleft()
+    def update_settings(self, new_settings: Dict[str, Any], restart: bool = False):
+        prev_recording = self.get_setting('enable_recording', True)
+        super().update_settings(new_settings, restart=restart)
+        self._recompute_targets()
+        now_recording = self.get_setting('enable_recording', True)
+        self.state['recording_enabled'] = now_recording
+        if now_recording != prev_recording:
+            self._apply_recording_led(now_recording)
+
+    def _apply_recording_led(self, enabled: bool):
+        """Blink the status LED while recording is enabled, else turn it off."""
+        led = self._status_led
+        if led is None:
+            return
+        try:
+            if enabled:
+                led.blink(on_time=1, off_time=1)
+            else:
+                led.off()
+        except Exception as e:
+            print(f"Warning: LED update failed: {e}")
+
+    def _record_metric(self, name: str, now_ns: int = None):
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        self.metrics[name].record(now_ns)
+
+    def _events_last_minute(self, name: str, now_ns: int) -> int:
+        return self.metrics[name].count_since(now_ns - 60_000_000_000)
 
 
         
     def run_loop(self):
         from dustycam.nodes.camera_sources import Picamera2Source
-        from dustycam.nodes.motion import detect_motion
+        from dustycam.nodes.motion import MotionDetector
         from dustycam.nodes.yolo import load_yolo_model, detect_objects
         from dustycam.nodes.drawing import draw_detections
         import cv2
-        from dustycam.nodes.drawing import draw_detections
-        import cv2
         from gpiozero import Button, LED
 
         # GPIO Control
         # Pull Up: True -> Default High (Open) -> is_pressed=False
         # Grounded -> Low -> is_pressed=True
+        # Edge-triggered callbacks keep state current without a GPIO read
+        # (sysfs/libgpiod round-trip) in the frame loop.
         enable_switch = Button(20, pull_up=True)
-        
+        # Callbacks write a plain attribute; the frame loop folds it into
+        # the next published snapshot.
+        self._gpio_active = enable_switch.is_pressed
+        enable_switch.when_pressed = lambda: setattr(self, '_gpio_active', True)
+        enable_switch.when_released = lambda: setattr(self, '_gpio_active', False)
+
         # Status LED (ACT is the green activity LED on Pi)
-        status_led = None
         try:
-            status_led = LED("ACT")
+            self._status_led = LED("ACT")
         except Exception as e:
             print(f"Warning: Could not access ACT LED: {e}")
-
-        was_enabled = False
+        self.state['recording_enabled'] = self.settings.enable_recording
+        self._apply_recording_led(self.settings.enable_recording)
 
         # Create run directory
         run_timestamp = int(time.time())
@@ -233,84 +424,132 @@ class PiMotionPipeline(Pipeline):
         print(f"Saving images to {run_dir.absolute()}")
 
         source = Picamera2Source()
-        previous_gray = None
-        model = load_yolo_model("yolov8n_int8_320.tflite")
-        previous_gray = None
+        motion_detector = MotionDetector()
+        writer = _AsyncImageWriter()
         model = load_yolo_model("yolov8n_int8_320.tflite")
-        
-        # Base set of classes we care about (for 'Record All' or individual selection)
-        supported_classes = ['person', 'car', 'motorbike', 'bus', 'train', 'truck', 'bicycle']
+
+        # Detection filtering compares int class ids, not label strings:
+        # the target names are mapped through the model's class table once
+        # (and again only when the settings change the target set).
+        class_names = getattr(model, 'names', None) or {}
+        if isinstance(class_names, (list, tuple)):
+            class_names = dict(enumerate(class_names))
+        targets_cache = None
+        target_cls_ids = frozenset()
 
         # Init tracking vars
-        last_time = time.time()
+        last_ns = time.monotonic_ns()
         frame_ctr = 0
         fps = 0.0
         hires_count = 0
 
+        # Filename prefixes built once; files are numbered by monotonic
+        # counters instead of int(time.time()), so no Path arithmetic per
+        # save and two events in the same second can't overwrite each other.
+        hires_prefix = os.fspath(run_dir) + os.sep + 'hires_'
+        false_motion_prefix = os.fspath(run_dir) + os.sep + 'false_motion_'
+        motion_prefix = os.fspath(run_dir) + os.sep + 'motion_'
+        false_motion_ctr = 0
+        motion_ctr = 0
+
+        # Framedrop gate: when the previous iteration took longer than
+        # 1.5x the source period (slow inference, save burst), drop the
+        # backlog and work from the newest frame only, so motion detection
+        # never compares frames that are seconds apart.
+        source_period_ns = int(1e9 / 30)  # lores stream nominal rate
+        last_loop_dur_ns = 0
+
+        # Frame pool for the low-res buffer: enough slots for the buffer
+        # plus a couple in flight, allocated once at the first frame's shape.
+        # Buffered frames are copied into recycled slots, so steady-state
+        # capture allocates no new arrays for buffering.
+        frame_pool = None
+        free_slots = None
+
+        def drain_buffer():
+            # Hand back copies (the async writer may still be encoding them
+            # after the slot is recycled) and return slots to the pool.
+            frames = []
+            while self.low_res_frame_buffer:
+                slot, frame = self.low_res_frame_buffer.popleft()
+                frames.append(frame.copy())
+                free_slots.append(slot)
+            return frames
+
         try:
             while self.running:
                 image = source.read()
-                self.set_preview("Source", image)
-                self.low_res_frame_buffer.append(image)
-
                 if image is None:
-                    time.sleep(0.01)
+                    # Block on the camera's frame event instead of waking
+                    # at 100 Hz to poll a stalled source.
+                    source.wait_frame(timeout=0.1)
                     continue
 
+                # One clock read per iteration; everything below (metrics,
+                # FPS, the state snapshot) shares it.
+                now_ns = time.monotonic_ns()
+
+                if last_loop_dur_ns > source_period_ns * 3 // 2:
+                    source.drain()
+
+                self.set_preview("Source", image)
+
+                if frame_pool is None:
+                    frame_pool = [np.empty_like(image)
+                                  for _ in range(self.low_res_frame_buffer_size + 2)]
+                    free_slots = deque(range(len(frame_pool)))
+                if len(self.low_res_frame_buffer) >= self.low_res_frame_buffer_size:
+                    old_slot, _ = self.low_res_frame_buffer.popleft()
+                    free_slots.append(old_slot)
+                slot = free_slots.popleft()
+                np.copyto(frame_pool[slot], image)
+                self.low_res_frame_buffer.append((slot, frame_pool[slot]))
+
                 # Pipeline Control Settings
                 do_motion = self.settings.enable_motion
                 do_recognition = self.settings.enable_recognition
                 do_recording = self.settings.enable_recording
 
-                # Update State
-                is_gpio_active = enable_switch.is_pressed
-                self.state['gpio_active'] = is_gpio_active
-                self.state['recording_enabled'] = do_recording
-                
-                # Handle LED state (Based on recording setting)
-                if status_led:
-                    if do_recording and not was_enabled:
-                        status_led.blink(on_time=1, off_time=1)
-                    elif not do_recording and was_enabled:
-                        status_led.off()
-                was_enabled = do_recording
-
-
                 # Motion Detection Stage
                 motion_detected = False
-                processed_image = image.copy()
-                
+                # No defensive copy: the detector only returns a new array
+                # when it actually draws boxes; otherwise the preview shares
+                # the source frame read-only.
+                processed_image = image
+
                 if do_motion:
                     threshold = self.settings.motion_threshold
                     blur_size = self.settings.motion_blur_size
                     min_area = self.settings.motion_min_area
                     max_area = self.settings.motion_max_area
-                    processed_image, motion_detected, previous_gray = detect_motion(image, previous_gray, threshold=threshold, blur_size=blur_size, min_area=min_area, max_area=max_area)
+                    processed_image, motion_detected = motion_detector.detect(image, threshold=threshold, blur_size=blur_size, min_area=min_area, max_area=max_area)
                 
                 if motion_detected:
-                    self._record_metric('motion')
+                    self._record_metric('motion', now_ns)
 
-                self.state['motion_detected'] = motion_detected
-                
                 # Update preview with motion boxes (or raw image if no motion check)
                 self.set_preview("Source", processed_image)
 
                 # FPS Calculation
                 frame_ctr += 1
-                curr_time = time.time()
-                if curr_time - last_time > 1.0:
-                    fps = frame_ctr / (curr_time - last_time)
+                if now_ns - last_ns > 1_000_000_000:
+                    fps = frame_ctr * 1e9 / (now_ns - last_ns)
                     frame_ctr = 0
-                    last_time = curr_time
-                
-                # Metrics Maintenance
-                self._prune_metrics()
-                
-                self.state['fps'] = round(fps, 1)
-                self.state['hires_count'] = hires_count
-                self.state['motion_events_1min'] = len(self.metrics['motion'])
-                self.state['recognition_events_1min'] = len(self.metrics['recognition'])
-                self.state['recording_events_1min'] = len(self.metrics['recording'])
+                    last_ns = now_ns
+
+                # Publish the state as one fresh snapshot per frame: a
+                # single atomic pointer swap, so concurrent readers (the
+                # websocket broadcast) never see a half-updated dict.
+                self.state = {
+                    'gpio_active': self._gpio_active,
+                    'recording_enabled': do_recording,
+                    'motion_detected': motion_detected,
+                    'fps': round(fps, 1),
+                    'hires_count': hires_count,
+                    'motion_events_1min': self._events_last_minute('motion', now_ns),
+                    'recognition_events_1min': self._events_last_minute('recognition', now_ns),
+                    'recording_events_1min': self._events_last_minute('recording', now_ns),
+                }
 
 
                 # Processing & Recording
@@ -319,32 +558,24 @@ class PiMotionPipeline(Pipeline):
                     
                     # Recognition Stage
                     if do_recognition:
-                        self._record_metric('recognition')
+                        self._record_metric('recognition', now_ns)
                         detections = detect_objects(image, model, confidence=0.5, imgsz=320)
                         
                     # Filter for target classes if we have detections
                     has_relevant_detections = False
                     if len(detections) > 0:
-                        detected = []
-                        
-                        # Determine active targets based on settings
-                        current_targets = []
-                        if self.settings.record_all:
-                            current_targets = supported_classes
-                        else:
-                            if self.settings.record_person: current_targets.append('person')
-                            if self.settings.record_car: current_targets.append('car')
-                            if self.settings.record_motorbike: current_targets.append('motorbike')
-                            if self.settings.record_bus: current_targets.append('bus')
-                            if self.settings.record_train: current_targets.append('train')
-                            if self.settings.record_truck: current_targets.append('truck')
-                            if self.settings.record_bicycle: current_targets.append('bicycle')
-
+                        # Active targets are cached as a frozenset and only
+                        # rebuilt when settings change; the id set refreshes
+                        # with it (identity check, so the common case is free).
+                        current_targets = self._targets
+                        if current_targets is not targets_cache:
+                            targets_cache = current_targets
+                            target_cls_ids = frozenset(
+                                i for i, n in class_names.items()
+                                if n in current_targets)
 
                         print(detections)
-                        for detection in detections:
-                            if detection['label'] in current_targets:
-                                detected.append(detection)
+                        detected = [d for d in detections if d['cls'] in target_cls_ids]
                         if len(detected) > 0:
                             has_relevant_detections = True
 
@@ -355,9 +586,9 @@ class PiMotionPipeline(Pipeline):
                             hi_res_image = source.take_photo()
                             if hi_res_image is not None:
                                 ## Save hi res image
-                                cv2.imwrite(str(run_dir / f"hires_{int(time.time())}.jpg"), hi_res_image)
+                                writer.save(f"{hires_prefix}{hires_count:08d}.jpg", hi_res_image)
                                 hires_count += 1
-                                self._record_metric('recording')
+                                self._record_metric('recording', now_ns)
                         elif do_recognition and not has_relevant_detections:
                              # YOLO ran but didn't find targets -> Treat as false positive if specific recognition was requested
                              pass # Don't save false positives if we are depending on recognition? 
@@ -365,9 +596,9 @@ class PiMotionPipeline(Pipeline):
                              # Let's preserve that logic but gated by do_recording.
                              
                              print('saving false motion image')
-                             for i,  frame in enumerate(self.low_res_frame_buffer):
-                                 cv2.imwrite(str(run_dir / f"false_motion_{int(time.time())}_{i}.jpg"), frame)
-                             self.low_res_frame_buffer.clear()
+                             for i, frame in enumerate(drain_buffer()):
+                                 writer.save(f"{false_motion_prefix}{false_motion_ctr:08d}_{i}.jpg", frame)
+                             false_motion_ctr += 1
                         elif not do_recognition:
                              # No recognition enabled, but motion detected and recording enabled.
                              # Save generic motion event? Or treat as "nothing confirmed"?
@@ -376,17 +607,22 @@ class PiMotionPipeline(Pipeline):
                              # Let's assume if Recognition is OFF, we treat ANY motion as worthy of a "motion capture" (maybe low res buffer?)
                              # For now, let's just default to saving the Low Res buffer if only Motion is on.
                              print('saving motion sequence (no recognition)')
-                             for i, frame in enumerate(self.low_res_frame_buffer):
-                                 cv2.imwrite(str(run_dir / f"motion_{int(time.time())}_{i}.jpg"), frame)
-                             self.low_res_frame_buffer.clear()
+                             for i, frame in enumerate(drain_buffer()):
+                                 writer.save(f"{motion_prefix}{motion_ctr:08d}_{i}.jpg", frame)
+                             motion_ctr += 1
+
+                last_loop_dur_ns = time.monotonic_ns() - now_ns
 
 
 
                 
         finally:
-            if status_led:
-                status_led.close()
+            if self._status_led:
+                self._status_led.close()
+                self._status_led = None
+            enable_switch.close()
             source.close()
+            writer.close()
 
 
 class BallYoloPipeline(Pipeline):
@@ -405,9 +641,8 @@ class BallYoloPipeline(Pipeline):
 
         source = BouncingBall()
         model = load_yolo_model("yolov8n")
-        detections = detect_objects(image, model, confidence=conf)
-
 
+        next_tick = time.monotonic()
         while self.running:
             image = source.next_frame()
             if image is None:
@@ -418,11 +653,19 @@ class BallYoloPipeline(Pipeline):
             conf = self.settings.confidence
             detections = detect_objects(image, model, confidence=conf)
             
-            # Use refactored drawing function
-            image = draw_detections(image, detections)
+            # Use refactored drawing function (copy first: the source reuses
+            # its canvas buffer and draw_detections draws in place)
+            image = draw_detections(image.copy(), detections)
 
             self.set_preview("Main", image)
-            time.sleep(0.03)
+            # Drift-free pacing: sleep to the next tick on the monotonic
+            # clock rather than a fixed 0.03 after variable work.
+            next_tick += 0.03
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()  # fell behind; resync
 
 
 class SyntheticMotionPipeline(Pipeline):
@@ -435,37 +678,53 @@ class SyntheticMotionPipeline(Pipeline):
 
     def run_loop(self):
         from dustycam.nodes.generated_sources import BouncingBall
-        from dustycam.nodes.motion import detect_motion
+        from dustycam.nodes.motion import MotionDetector
 
         source = BouncingBall()
-        previous_gray = None
-        
+        motion_detector = MotionDetector()
+
+        next_tick = time.monotonic()
         while self.running:
             image = source.next_frame()
             if image is None:
                 time.sleep(0.01)
                 continue
-                
+
             thresh = self.settings.threshold
             min_a = self.settings.min_area
-            processed_image, detected, previous_gray = detect_motion(image, previous_gray, threshold=thresh, min_area=min_a)
+            processed_image, detected = motion_detector.detect(image, threshold=thresh, min_area=min_a)
             
             self.set_preview("Main", processed_image)
             self.state['motion_detected'] = detected
-            time.sleep(0.03)
+            next_tick += 0.03
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()  # fell behind; resync
 
 
 # Factory / Registry
-    
+
 _PIPELINE_CLASSES: Dict[str, Type[Pipeline]] = {}
+# Memoized instances: constructing a pipeline loads settings from disk and
+# starts its flusher thread, so repeated lookups of the same name (pipeline
+# switches, restarts) reuse one instance instead of building a fresh one.
+_PIPELINE_INSTANCES: Dict[str, Pipeline] = {}
 
 def register_pipeline(name: str, cls: Type[Pipeline]):
     _PIPELINE_CLASSES[name] = cls
+    _PIPELINE_INSTANCES.pop(name, None)
 
 def get_pipeline_by_name(name: str) -> Optional[Pipeline]:
+    pipeline = _PIPELINE_INSTANCES.get(name)
+    if pipeline is not None:
+        return pipeline
     cls = _PIPELINE_CLASSES.get(name)
     if cls:
-        return cls()
+        pipeline = cls()
+        _PIPELINE_INSTANCES[name] = pipeline
+        return pipeline
 
     return None
 
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import time
+from typing import List, Optional, Tuple
+
+from dustycam.frame import FramePacket
+from dustycam.node import Node, SinkNode, SourceNode
+
+
+class Runner:
+    """
+    Drives one or more source→...→sink chains.
+    `run_once` pulls a single packet from each source and pushes it through
+    the connected nodes; `run` loops until stopped or sources are exhausted.
+    """
+
+    def __init__(self, sources: List[SourceNode], sinks: List[SinkNode],
+                 max_inflight: int = 8):
+        self.sources = list(sources)
+        self.sinks = list(sinks)
+        self.running = False
+        self.nodes = self._collect_graph()
+        # Stamp compact per-node ids and a sink flag once at build time, so
+        # the per-packet hot path reads plain attributes instead of hashing
+        # nodes into dicts/sets.
+        for i, node in enumerate(self.nodes):
+            node._runner_id = i
+            node._runner_is_sink = False
+        for sink in self.sinks:
+            sink._runner_is_sink = True
+        # Backpressure: cap how many packets may sit buffered inside nodes
+        # (e.g. a batching detector) before partial batches are forced out.
+        # Must be at least the largest node batch size, or batches could
+        # never fill before the cap engages.
+        max_batch = max((getattr(node, "batch_size", 1) or 1)
+                        for node in self.nodes)
+        if max_inflight < max_batch:
+            raise ValueError(
+                f"max_inflight ({max_inflight}) must be >= the largest "
+                f"node batch_size ({max_batch})")
+        self.max_inflight = max_inflight
+        self._buffered = 0
+
+    def _collect_graph(self) -> Tuple[Node, ...]:
+        """Walk from the sources and gather every reachable node."""
+        seen = set()
+        order: List[Node] = []
+        # Iterative DFS keyed by object id: no recursion and no Node.__hash__
+        # dispatch while building.
+        stack = list(reversed(self.sources))
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            order.append(node)
+            stack.extend(reversed(node.children))
+        return tuple(order)
+
+    def _eval_node_chain(self, node: Node, packet: FramePacket) -> None:
+        """
+        Evaluate a node and everything downstream of it with the given
+        packet. Iterative with an explicit work stack: no Python call frame
+        per node per frame, and deep chains can't hit the recursion limit.
+        """
+        stack = [(node, packet)]
+        while stack:
+            node, packet = stack.pop()
+            result = node.forward(packet)
+            if result is None:
+                # Node buffered the packet (e.g. batched inference); nothing to propagate yet.
+                self._buffered += 1
+                continue
+            # Batching nodes may release several packets at once.
+            results = result if isinstance(result, list) else [result]
+            if len(results) > 1:
+                self._buffered -= len(results) - 1
+            for res in results:
+                node.store_result(res)
+                if node._runner_is_sink:
+                    node.consume(res)
+            # Push in reverse so the LIFO pop hands packets downstream in
+            # frame order: batch releases reach every child oldest-first,
+            # and each child's store_result ends on the newest packet.
+            if node.children:
+                stack.extend(
+                    (child, res)
+                    for res in reversed(results)
+                    for child in reversed(node.children))
+
+    def _drain_buffered(self) -> None:
+        """
+        Force every partially filled batch downstream, in graph order.
+        Flushing is the only guaranteed way to shrink `_buffered` — batch
+        releases need new input, which the gate is blocking — so the
+        backpressure path drains here instead of waiting.
+        """
+        for node in self.nodes:
+            leftovers = node.flush()
+            if leftovers:
+                for packet in leftovers:
+                    node.store_result(packet)
+                    if node._runner_is_sink:
+                        node.consume(packet)
+                    for child in node.children:
+                        self._eval_node_chain(child, packet)
+        # self.nodes is in topological order, so every node was flushed
+        # after the last packet that could reach it: nothing is pending.
+        self._buffered = 0
+
+    def run_once(self) -> bool:
+        """Process one packet from each source. Returns False when all sources are done."""
+        produced = False
+        for source in self.sources:
+            if self._buffered >= self.max_inflight:
+                # Too many frames parked inside batching nodes: push the
+                # partial batches out rather than parking more, bounding
+                # latency without ever wedging the loop.
+                self._drain_buffered()
+            packet = source.next_packet()
+            if packet is None:
+                continue
+            produced = True
+            self._eval_node_chain(source, packet)
+        return produced
+
+    def run(self, max_frames: Optional[int] = None):
+        """Loop until stopped, a source runs dry, or max_frames is reached."""
+        self.running = True
+        frames = 0
+        try:
+            while self.running:
+                if not self.run_once():
+                    time.sleep(0.01)
+                    continue
+                frames += 1
+                if max_frames is not None and frames >= max_frames:
+                    break
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.running = False
+        self._drain_buffered()
+        for node in self.nodes:
+            node.close()
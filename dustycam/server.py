@@ -0,0 +1,151 @@
+"""
+Persistent YOLO inference daemon.
+
+Loading a YOLO model (and initializing CUDA) costs seconds per process; for
+repeated CLI invocations that cold start dominates. `dustycam serve` keeps
+one model resident and answers detection requests over a Unix-domain socket
+with a length-prefixed JSON protocol:
+
+    request:  {"paths": ["/abs/a.jpg", ...]}
+    response: {"detections": {"/abs/a.jpg": [{bbox, conf, cls, label}, ...]}}
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import struct
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+SOCKET_PATH = os.path.expanduser("~/.dustycam/yolo.sock")
+_HEADER = struct.Struct(">I")
+
+
+def _jsonable(detections: List[Dict]) -> List[Dict]:
+    """Convert numpy scalar types in detection dicts to plain Python."""
+    return [
+        {
+            'bbox': [int(v) for v in d['bbox']],
+            'conf': float(d['conf']),
+            'cls': int(d['cls']),
+            'label': d['label'],
+        }
+        for d in detections
+    ]
+
+
+def _read_msg(sock: socket.socket) -> dict:
+    header = sock.recv(_HEADER.size, socket.MSG_WAITALL)
+    if len(header) < _HEADER.size:
+        raise ConnectionError("Server closed connection")
+    (length,) = _HEADER.unpack(header)
+    payload = sock.recv(length, socket.MSG_WAITALL)
+    return json.loads(payload)
+
+
+def _send_msg(sock: socket.socket, message: dict):
+    payload = json.dumps(message).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def request_detections(paths: List[str], socket_path: str = SOCKET_PATH) -> Dict[str, List[Dict]]:
+    """Ask a running daemon for detections on the given image paths."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        _send_msg(sock, {"paths": [os.path.abspath(p) for p in paths]})
+        return _read_msg(sock)["detections"]
+    finally:
+        sock.close()
+
+
+def ensure_server(model_path: str = "yolov8n.pt", socket_path: str = SOCKET_PATH,
+                  timeout: float = 30.0) -> bool:
+    """Start the daemon in the background if its socket is not answering."""
+    if _socket_alive(socket_path):
+        return True
+    subprocess.Popen(
+        [sys.executable, "-m", "dustycam.server", "--model_path", model_path,
+         "--socket", socket_path],
+        start_new_session=True,
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if _socket_alive(socket_path):
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def _socket_alive(socket_path: str) -> bool:
+    if not os.path.exists(socket_path):
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def serve(model_path: str = "yolov8n.pt", socket_path: str = SOCKET_PATH):
+    """Load the model once and serve detection requests until killed."""
+    import cv2
+    from dustycam.nodes.yolo import load_yolo_model, detect_objects
+
+    model = load_yolo_model(model_path)
+    if not model:
+        print("Failed to load model.")
+        return
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            header = await reader.readexactly(_HEADER.size)
+            (length,) = _HEADER.unpack(header)
+            request = json.loads(await reader.readexactly(length))
+
+            detections = {}
+            for path in request.get("paths", []):
+                image = cv2.imread(path)
+                dets = detect_objects(image, model) if image is not None else []
+                detections[path] = _jsonable(dets)
+
+            payload = json.dumps({"detections": detections}).encode('utf-8')
+            writer.write(_HEADER.pack(len(payload)) + payload)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = await asyncio.start_unix_server(handle, path=socket_path)
+        print(f"YOLO server listening on {socket_path}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Stopping YOLO server.")
+    finally:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="DustyCam YOLO inference daemon")
+    parser.add_argument("--model_path", type=str, default="yolov8n.pt")
+    parser.add_argument("--socket", type=str, default=SOCKET_PATH)
+    args = parser.parse_args()
+    serve(args.model_path, args.socket)
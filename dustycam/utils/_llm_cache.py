@@ -0,0 +1,54 @@
+import hashlib
+import os
+
+# On-disk exact-match cache for LLM responses. A repeated call with the
+# same inputs (reruns over a folder, retries) costs a local lookup instead
+# of a multi-second network round-trip. diskcache is optional; without it
+# every lookup misses and callers just hit the API as before.
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+_CACHE_DIR = os.path.expanduser("~/.cache/dustycam/llm")
+
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None and diskcache is not None:
+        _cache = diskcache.Cache(_CACHE_DIR)
+    return _cache
+
+
+def key_for(*parts) -> str:
+    """Stable hex key over a mix of str/bytes parts (model, prompt, data)."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        h.update(part)
+        h.update(b'\x00')
+    return h.hexdigest()
+
+
+def get(key: str):
+    cache = _get_cache()
+    if cache is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception:
+        return None
+
+
+def put(key: str, value) -> None:
+    """Store a JSON-serializable value; failures are silently ignored."""
+    cache = _get_cache()
+    if cache is None:
+        return
+    try:
+        cache.set(key, value)
+    except Exception:
+        pass
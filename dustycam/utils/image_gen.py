@@ -1,11 +1,17 @@
+import asyncio
+import io
 import os
+import threading
 import time
+import numpy as np
 from google import genai
 from google.genai import types
 from PIL import Image, ImageDraw, ImageColor
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
+from dustycam.utils import _llm_cache
+
 load_dotenv()
 
 # Helper class to represent a bounding box
@@ -13,57 +19,210 @@ class BoundingBox(BaseModel):
     box_2d: list[int]
     label: str
 
+# One client per process: each genai.Client sets up its own HTTP session and
+# TLS state, so rebuilding it per call pays connection setup on every API
+# entry point. Double-checked locking keeps the fast path lock-free.
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
 def get_client():
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        print("Error: GOOGLE_API_KEY environment variable not set.")
-        return None
-    try:
-        return genai.Client(api_key=api_key)
-    except Exception as e:
-        print(f"Failed to initialize client: {e}")
-        return None
+    global _CLIENT
+    if _CLIENT is not None:
+        return _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is not None:
+            return _CLIENT
+        api_key = os.environ.get("GOOGLE_API_KEY")
+        if not api_key:
+            print("Error: GOOGLE_API_KEY environment variable not set.")
+            return None
+        try:
+            _CLIENT = genai.Client(api_key=api_key)
+        except Exception as e:
+            print(f"Failed to initialize client: {e}")
+            return None
+    return _CLIENT
+
+def _image_payload(image_path: str) -> tuple[bytes, str]:
+    """
+    Load an image and shrink it for upload: Gemini's vision tower
+    downsamples internally, so sending more than ~1024 px per edge only
+    costs upload bandwidth and latency. Returns (bytes, mime_type);
+    box coordinates are unaffected since they come back 0-1000 normalized.
+    """
+    with Image.open(image_path) as im:
+        im.thumbnail((1024, 1024), Image.LANCZOS)
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        buf = io.BytesIO()
+        im.save(buf, format="JPEG", quality=85)
+    return buf.getvalue(), "image/jpeg"
+
 
 def detect_license_plates(image_path: str) -> list[BoundingBox]:
     client = get_client()
     if not client: return []
     print(f"Detecting license plates in {image_path}...")
     try:
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
+        image_bytes, mime_type = _image_payload(image_path)
+        model = 'gemini-2.0-flash-exp'
         prompt = "Return bounding boxes for all license plates in the image. Label them as 'license plate'."
+        # Exact-match cache on (image bytes, model, prompt): reruns over the
+        # same folder skip the network round-trip entirely.
+        cache_key = _llm_cache.key_for(image_bytes, model, prompt)
+        cached = _llm_cache.get(cache_key)
+        if cached is not None:
+            return [BoundingBox(**b) for b in cached]
         response = client.models.generate_content(
-            model='gemini-2.0-flash-exp',
-            contents=[types.Part.from_bytes(data=image_bytes, mime_type="image/png"), prompt],
+            model=model,
+            contents=[types.Part.from_bytes(data=image_bytes, mime_type=mime_type), prompt],
             config=types.GenerateContentConfig(
                 response_mime_type="application/json",
                 response_schema=list[BoundingBox],
                 safety_settings=[types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_ONLY_HIGH")],
             )
         )
-        return response.parsed if response.parsed else []
+        parsed = response.parsed if response.parsed else []
+        _llm_cache.put(cache_key, [b.model_dump() for b in parsed])
+        return parsed
+    except Exception as e:
+        print(f"Failed to detect objects: {e}")
+        return []
+
+async def adetect_license_plates(image_path: str, sem: asyncio.Semaphore = None) -> list[BoundingBox]:
+    """
+    Async variant of detect_license_plates. Several in-flight calls overlap
+    their network latency instead of serializing 1-5 s each; pass a shared
+    semaphore (see gather_detect) to bound the concurrency. Retries with
+    exponential backoff when the API rate-limits.
+    """
+    client = get_client()
+    if not client: return []
+    print(f"Detecting license plates in {image_path}...")
+    try:
+        image_bytes, mime_type = _image_payload(image_path)
+        model = 'gemini-2.0-flash-exp'
+        prompt = "Return bounding boxes for all license plates in the image. Label them as 'license plate'."
+        cache_key = _llm_cache.key_for(image_bytes, model, prompt)
+        cached = _llm_cache.get(cache_key)
+        if cached is not None:
+            return [BoundingBox(**b) for b in cached]
+
+        async def call():
+            for attempt in range(4):
+                try:
+                    return await client.aio.models.generate_content(
+                        model=model,
+                        contents=[types.Part.from_bytes(data=image_bytes, mime_type=mime_type), prompt],
+                        config=types.GenerateContentConfig(
+                            response_mime_type="application/json",
+                            response_schema=list[BoundingBox],
+                            safety_settings=[types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_ONLY_HIGH")],
+                        )
+                    )
+                except Exception as e:
+                    if attempt == 3 or '429' not in str(e):
+                        raise
+                    await asyncio.sleep(2 ** attempt)
+
+        if sem is not None:
+            async with sem:
+                response = await call()
+        else:
+            response = await call()
+        parsed = response.parsed if response.parsed else []
+        _llm_cache.put(cache_key, [b.model_dump() for b in parsed])
+        return parsed
     except Exception as e:
         print(f"Failed to detect objects: {e}")
         return []
 
+
+async def gather_detect(image_paths: list[str]) -> list[list[BoundingBox]]:
+    """
+    Run adetect_license_plates over many paths concurrently, bounded by
+    GEMINI_CONCURRENCY (default 5) so a folder walk overlaps API latency
+    without tripping rate limits.
+    """
+    sem = asyncio.Semaphore(int(os.environ.get("GEMINI_CONCURRENCY", "5")))
+    return list(await asyncio.gather(
+        *[adetect_license_plates(path, sem) for path in image_paths]))
+
+
+def detect_license_plates_batch(image_paths: list[str], chunk_size: int = 8) -> list[list[BoundingBox]]:
+    """
+    Detect license plates in several images with one Gemini request per
+    chunk of `chunk_size`, amortizing the TLS round-trip and prompt prefix
+    over the batch instead of paying one call per image. Returns one box
+    list per input path, in order.
+    """
+    client = get_client()
+    if not client: return [[] for _ in image_paths]
+    model = 'gemini-2.0-flash-exp'
+    all_results: list[list[BoundingBox]] = []
+    for start in range(0, len(image_paths), chunk_size):
+        chunk = image_paths[start:start + chunk_size]
+        print(f"Detecting license plates in {len(chunk)} images (batched)...")
+        try:
+            images = []
+            mime_type = "image/jpeg"
+            for path in chunk:
+                data, mime_type = _image_payload(path)
+                images.append(data)
+            prompt = (
+                f"You are given {len(chunk)} images. Return a JSON array with one "
+                "element per image, in input order: element i is the list of "
+                "bounding boxes for all license plates in image i (empty list if "
+                "none). Label each box as 'license plate'."
+            )
+            cache_key = _llm_cache.key_for(model, prompt, *images)
+            cached = _llm_cache.get(cache_key)
+            if cached is not None:
+                all_results.extend([BoundingBox(**b) for b in boxes] for boxes in cached)
+                continue
+            contents = [types.Part.from_bytes(data=data, mime_type=mime_type)
+                        for data in images]
+            contents.append(prompt)
+            response = client.models.generate_content(
+                model=model,
+                contents=contents,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    response_schema=list[list[BoundingBox]],
+                    safety_settings=[types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_ONLY_HIGH")],
+                )
+            )
+            parsed = response.parsed if response.parsed else []
+            # Pad/trim so the output stays aligned with the input paths.
+            parsed = list(parsed)[:len(chunk)]
+            parsed += [[] for _ in range(len(chunk) - len(parsed))]
+            _llm_cache.put(cache_key, [[b.model_dump() for b in boxes] for boxes in parsed])
+            all_results.extend(parsed)
+        except Exception as e:
+            print(f"Failed to detect objects in batch: {e}")
+            all_results.extend([] for _ in chunk)
+    return all_results
+
+
 def plot_bounding_boxes(image_path: str, bounding_boxes: list[BoundingBox]) -> str:
     if not bounding_boxes: return None
     try:
         with Image.open(image_path) as im:
             width, height = im.size
             draw = ImageDraw.Draw(im)
-            for bbox in bounding_boxes:
-                # Gemini returns [y_min, x_min, y_max, x_max] scaled 0-1000
-                abs_y_min = int(bbox.box_2d[0] / 1000 * height)
-                abs_x_min = int(bbox.box_2d[1] / 1000 * width)
-                abs_y_max = int(bbox.box_2d[2] / 1000 * height)
-                abs_x_max = int(bbox.box_2d[3] / 1000 * width)
-                
-                # Check if box is valid (has area)
-                if abs_x_max > abs_x_min and abs_y_max > abs_y_min:
-                    draw.rectangle(((abs_x_min, abs_y_min), (abs_x_max, abs_y_max)), outline="red", width=4)
-                    if bbox.label:
-                        draw.text((abs_x_min + 8, abs_y_min + 6), bbox.label, fill="red")
+            # Gemini returns [y_min, x_min, y_max, x_max] scaled 0-1000;
+            # scale every box to pixels in one vectorized expression and
+            # mask out degenerate (zero-area) boxes before drawing.
+            coords = np.array([bbox.box_2d for bbox in bounding_boxes], dtype=np.float64)
+            scale = np.array([height, width, height, width]) / 1000.0
+            abs_coords = (coords * scale).astype(np.int32)
+            valid = (abs_coords[:, 2] > abs_coords[:, 0]) & (abs_coords[:, 3] > abs_coords[:, 1])
+            for bbox, (y_min, x_min, y_max, x_max), ok in zip(bounding_boxes, abs_coords, valid):
+                if not ok:
+                    continue
+                draw.rectangle(((x_min, y_min), (x_max, y_max)), outline="red", width=4)
+                if bbox.label:
+                    draw.text((x_min + 8, y_min + 6), bbox.label, fill="red")
             
             base, ext = os.path.splitext(image_path)
             annotated_path = f"{base}_annotated{ext}"
@@ -82,14 +241,25 @@ def generate_image_prompts(topic: str, count: int = 5) -> list[str]:
     prompt_request = f"""
     Act as an expert prompt engineer for Google Vertex AI Imagen 3.
     Goal: Generate {count} distinct image generation prompts for the topic: "{topic}".
-    Output: Provide ONLY the output as a simple list of {count} prompts, one per line.
+    Output: Provide ONLY the output as a JSON array of {count} prompt strings.
     """
     try:
-        response = client.models.generate_content(model='gemini-2.0-flash-exp', contents=prompt_request)
-        lines = response.text.split('\n')
-        prompts = [line.strip() for line in lines if line.strip() and not line.strip()[0].isdigit()]
-        if not prompts: prompts = [line.strip() for line in lines if line.strip()]
-        return prompts[:count]
+        model = 'gemini-2.0-flash-exp'
+        # No disk cache here, deliberately: this call is creative — repeat
+        # runs on the same topic should produce fresh prompts, unlike the
+        # deterministic box-detection calls that _llm_cache memoizes.
+        # Structured output (same machinery as detect_license_plates): the
+        # API hands back a parsed list, replacing the line-splitting and
+        # leading-digit heuristics that silently dropped prompts.
+        response = client.models.generate_content(
+            model=model,
+            contents=prompt_request,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=list[str],
+            )
+        )
+        return (response.parsed or [])[:count]
     except Exception as e:
         print(f"Failed to generate prompts: {e}")
         return []
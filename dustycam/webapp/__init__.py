@@ -1,16 +1,22 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
 
 from .routes import router, broadcast_loop
 
 def create_app(pipeline=None):
     app = FastAPI(title="DustyCam")
-    
+
     if pipeline:
         app.state.pipeline = pipeline
-        
+
+    # Dedicated pool for JPEG encodes: asyncio.to_thread shares the loop's
+    # default executor with every other blocking call, so encodes can queue
+    # behind unrelated work (and vice versa) under load.
+    app.state.jpeg_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="jpeg")
+
     static_path = Path(__file__).parent / "static"
     app.mount("/static", StaticFiles(directory=static_path), name="static")
     
@@ -27,5 +33,9 @@ def create_app(pipeline=None):
     @app.on_event("startup")
     async def startup_event():
         asyncio.create_task(broadcast_loop(app))
-    
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        app.state.jpeg_pool.shutdown(wait=False)
+
     return app
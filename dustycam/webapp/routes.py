@@ -3,15 +3,50 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
 import asyncio
-import base64
 import json
 import time
 from typing import List, Dict, Any
 import os
 
+# orjson serializes the per-tick websocket envelope ~3x faster than stdlib
+# json; optional, same fallback pattern as the settings file in pipeline.py.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
 router = APIRouter()
 templates = Jinja2Templates(directory=Path(__file__).parent / "templates")
 
+# libjpeg-turbo encodes with SIMD kernels (NEON on the Pi, AVX2 on x86),
+# ~3-4x faster than a vanilla-libjpeg cv2 build at the same quality. It's
+# optional; every encode path falls back to cv2.imencode without it.
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _turbo = TurboJPEG()
+except Exception:
+    _turbo = None
+
+
+def _encode_jpeg(frame, quality: int = 75):
+    """JPEG-encode a BGR frame; returns bytes or None."""
+    if _turbo is not None:
+        try:
+            return _turbo.encode(frame, quality=quality, pixel_format=TJPF_BGR)
+        except Exception:
+            pass
+    import cv2
+    ret, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality,
+                                             cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+                                             cv2.IMWRITE_JPEG_PROGRESSIVE, 0])
+    return jpeg.tobytes() if ret else None
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
@@ -26,51 +61,104 @@ class ConnectionManager:
     async def broadcast(self, message: dict):
         # We must serialize to text for consistency with previous helper
         # Or just send JSON
-        text = json.dumps(message)
+        text = _dumps(message)
+        for connection in self.active_connections:
+            try:
+                await connection.send_text(text)
+            except Exception:
+                # Handle broken pipe
+                pass
+
+    async def broadcast_binary(self, header: dict, blobs: Dict[str, bytes]):
+        """
+        One small JSON header frame (meta + blob names in order) followed by
+        the raw JPEG bytes as binary frames. Avoids base64's ~33% payload
+        inflation and the CPU spent inflating bytes to ASCII and escaping
+        them through json.dumps.
+        """
+        text = _dumps(header)
+        payloads = list(blobs.values())
         for connection in self.active_connections:
             try:
                 await connection.send_text(text)
+                for data in payloads:
+                    await connection.send_bytes(data)
             except Exception:
                 # Handle broken pipe
                 pass
 
 manager = ConnectionManager()
 
+# Last encoded JPEG per preview, keyed by a cheap frame fingerprint so an
+# unchanged preview (idle/stalled pipeline) reuses the previous bytes
+# instead of re-encoding every tick. Buffer pointer alone isn't enough —
+# sources redraw into persistent canvases — so a strided-subsample checksum
+# is folded in; it touches a few hundred pixels vs a full JPEG encode.
+_last_enc: Dict[str, tuple] = {}
+
+
+def _frame_fingerprint(frame) -> tuple:
+    return (frame.ctypes.data, frame.shape, int(frame[::32, ::32].sum()))
+
+
 async def broadcast_loop(app):
     """Background task to push frames to connected clients."""
     print("Starting FastAPI broadcast loop...")
     import cv2
-    
+
+    # The pipeline is attached to app.state before startup and never
+    # replaced, so capture the reference once instead of looking it up on
+    # every tick.
+    pipeline = getattr(app.state, "pipeline", None)
+
+    # Preview encode settings: quality 75 with Huffman optimization and
+    # progressive scan off roughly halves encode time vs the defaults, and
+    # the browser preview doesn't need more than ~640 px of width.
+    preview_width = 640
+
     while True:
         try:
             # Rate limit: 2 FPS
             await asyncio.sleep(0.5)
-            
-            pipeline = getattr(app.state, "pipeline", None)
+
             if not pipeline or not manager.active_connections:
                 continue
 
             # Get previews
             previews = list(pipeline.previews.keys())
-            payload = {}
-            
+
             # Encode in thread to avoid blocking event loop
             def encode_frames():
                 data = {}
                 for name in previews:
                     frame = pipeline.get_preview(name)
                     if frame is not None:
-                        ret, jpeg = cv2.imencode('.jpg', frame)
-                        if ret:
-                            b64 = base64.b64encode(jpeg).decode('utf-8')
-                            data[name] = f"data:image/jpeg;base64,{b64}"
+                        fp = _frame_fingerprint(frame)
+                        prev = _last_enc.get(name)
+                        if prev is not None and prev[0] == fp:
+                            data[name] = prev[1]
+                            continue
+                        h, w = frame.shape[:2]
+                        if w > preview_width:
+                            frame = cv2.resize(
+                                frame, (preview_width, h * preview_width // w),
+                                interpolation=cv2.INTER_AREA)
+                        jpeg = _encode_jpeg(frame, quality=75)
+                        if jpeg is not None:
+                            data[name] = jpeg
+                            _last_enc[name] = (fp, jpeg)
                 return data
 
-            payload = await asyncio.to_thread(encode_frames)
-            
-            if payload:
+            # Encodes run on the app's dedicated jpeg pool rather than the
+            # loop's default executor, so they never queue behind unrelated
+            # blocking work like the recordings scan.
+            blobs = await asyncio.get_running_loop().run_in_executor(
+                app.state.jpeg_pool, encode_frames)
+
+            if blobs:
                 meta = pipeline.state
-                await manager.broadcast({'images': payload, 'meta': meta})
+                await manager.broadcast_binary(
+                    {'meta': meta, 'names': list(blobs.keys())}, blobs)
                 
         except asyncio.CancelledError:
             break
@@ -78,47 +166,98 @@ async def broadcast_loop(app):
             print(f"Broadcast error: {e}")
             await asyncio.sleep(1)
 
+# Both pages are fully static (previews/settings arrive over the WebSocket),
+# so render each template once and serve the cached UTF-8 bytes afterwards —
+# one write with a known Content-Length instead of a Jinja render per request.
+_page_cache: Dict[str, bytes] = {}
+
+def _render_page(name: str) -> bytes:
+    page = _page_cache.get(name)
+    if page is None:
+        page = templates.get_template(name).render().encode('utf-8')
+        _page_cache[name] = page
+    return page
+
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    pipeline = getattr(request.app.state, "pipeline", None)
-    previews = []
-    if pipeline:
-        previews = list(pipeline.previews.keys())
-    return templates.TemplateResponse("index.html", {"request": request, "nodes": previews})
+    return HTMLResponse(_render_page("index.html"))
 
 @router.get("/gallery", response_class=HTMLResponse)
 async def gallery(request: Request):
-    return templates.TemplateResponse("gallery.html", {"request": request})
+    return HTMLResponse(_render_page("gallery.html"))
 
-@router.get("/api/recordings")
-async def get_recordings():
-    data_path = Path("/opt/dustycam/data")
-    if not data_path.exists():
-        return []
-    
+# Cached run list (names + timestamps only) keyed on the data directory's
+# mtime: a run starting or finishing touches the parent directory, and
+# everything in between serves the cached list without walking the SD card.
+_rec_cache: tuple = (None, [])
+
+_DATA_PATH = Path("/opt/dustycam/data")
+
+
+def _scan_runs(data_path: str) -> List[Dict[str, Any]]:
     runs = []
-    # List all run_ directories
-    for item in data_path.iterdir():
-        if item.is_dir() and item.name.startswith("run_"):
-            images = []
-            # Find images in the run dir
-            for img in item.glob("*.jpg"):
-                # URL path: /files/{run_name}/{img_name}
-                images.append(f"/files/{item.name}/{img.name}")
-            
-            # Sort images by name (timestamp usually)
-            images.sort()
-            
-            runs.append({
-                "name": item.name,
-                "timestamp": item.stat().st_mtime,
-                "images": images
-            })
-    
+    # os.scandir hands back type and stat info from the directory read
+    # itself, instead of one stat() syscall per entry like iterdir + stat.
+    with os.scandir(data_path) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.name.startswith("run_"):
+                runs.append({
+                    "name": entry.name,
+                    "timestamp": entry.stat().st_mtime,
+                })
     # Sort runs by timestamp descending (newest first)
     runs.sort(key=lambda x: x['timestamp'], reverse=True)
     return runs
 
+
+def _scan_run_images(run_path: str, run_name: str) -> List[str]:
+    images = []
+    with os.scandir(run_path) as files:
+        for f in files:
+            if f.is_file() and f.name.endswith(".jpg"):
+                # URL path: /files/{run_name}/{img_name}
+                images.append(f"/files/{run_name}/{f.name}")
+    # Sort images by name (timestamp usually)
+    images.sort()
+    return images
+
+
+@router.get("/api/recordings")
+async def get_recordings(offset: int = 0, limit: int = 20):
+    global _rec_cache
+    if not _DATA_PATH.exists():
+        return []
+
+    mtime = _DATA_PATH.stat().st_mtime
+    if mtime == _rec_cache[0]:
+        runs = _rec_cache[1]
+    else:
+        # The walk stats every run on the card; run it off the event loop
+        # so a slow SD card can't starve the websocket broadcast.
+        runs = await asyncio.to_thread(_scan_runs, str(_DATA_PATH))
+        _rec_cache = (mtime, runs)
+
+    # Page over runs and list images only for the page actually requested —
+    # the full listing grows without bound on long-lived installations.
+    page = runs[offset:offset + limit]
+    results = []
+    for run in page:
+        images = await asyncio.to_thread(
+            _scan_run_images, str(_DATA_PATH / run['name']), run['name'])
+        results.append({**run, "images": images})
+    return results
+
+
+@router.get("/api/recordings/{run_name}/images")
+async def get_recording_images(run_name: str):
+    # Reject anything that could escape the data directory.
+    if not run_name.startswith("run_") or "/" in run_name or ".." in run_name:
+        return JSONResponse({"error": "Unknown run"}, status_code=404)
+    run_path = _DATA_PATH / run_name
+    if not run_path.is_dir():
+        return JSONResponse({"error": "Unknown run"}, status_code=404)
+    return await asyncio.to_thread(_scan_run_images, str(run_path), run_name)
+
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
@@ -131,6 +270,36 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception:
         manager.disconnect(websocket)
 
+# Multipart boundary pieces are constant, so the per-frame header is one
+# %-format away instead of rebuilding header lines field by field. Each
+# frame goes out as a single concatenated bytes chunk (header + payload +
+# trailer), one write per frame instead of several small ones.
+_MJPEG_PART = b"--FRAME\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n"
+
+
+@router.get('/stream/{preview_name}')
+async def stream(preview_name: str, request: Request):
+    """MJPEG stream of a pipeline preview."""
+    pipeline = getattr(request.app.state, "pipeline", None)
+    if not pipeline:
+        return JSONResponse("No Pipeline Configured", status_code=500)
+
+    from fastapi.responses import StreamingResponse
+
+    async def generate():
+        while True:
+            frame = pipeline.get_preview(preview_name)
+            if frame is not None:
+                data = await asyncio.get_running_loop().run_in_executor(
+                    request.app.state.jpeg_pool, _encode_jpeg, frame, 90)
+                if data:
+                    yield (_MJPEG_PART % len(data)) + data + b"\r\n"
+            await asyncio.sleep(0.1)
+
+    return StreamingResponse(
+        generate(), media_type="multipart/x-mixed-replace; boundary=FRAME")
+
+
 @router.get("/api/settings")
 async def get_settings(request: Request):
     pipeline = getattr(request.app.state, "pipeline", None)
@@ -179,13 +348,9 @@ async def snapshot(preview_name: str, request: Request):
     frame = pipeline.get_preview(preview_name)
     
     if frame is not None:
-        import cv2
-        # Run encode in thread
-        def encode():
-             ret, jpeg = cv2.imencode('.jpg', frame)
-             return jpeg.tobytes() if ret else None
-             
-        data = await asyncio.to_thread(encode)
+        # Run encode on the dedicated jpeg pool
+        data = await asyncio.get_running_loop().run_in_executor(
+            request.app.state.jpeg_pool, _encode_jpeg, frame, 90)
         if data:
              from fastapi.responses import Response
              return Response(content=data, media_type="image/jpeg")
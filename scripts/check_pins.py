@@ -1,17 +1,53 @@
 #!/usr/bin/env python3
 import time
 import sys
-from gpiozero import Button
+
+# lgpio reads every claimed pin with one group_read ioctl instead of one
+# syscall per pin per refresh like gpiozero's Button.value. Optional: when
+# it isn't installed we fall back to the original gpiozero polling.
+try:
+    import lgpio
+except ImportError:
+    lgpio = None
 
 # Configuration
 # Standard GPIO pins on Raspberry Pi (BCM numbering)
 GPIO_PINS = [2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27]
 
-def monitor():
-    print("Initializing pins... (Ctrl+C to stop)")
+# ANSI escape codes (constant, so build them once)
+GREEN = "\033[92m"
+RED = "\033[91m"
+RESET = "\033[0m"
+
+
+def _make_reader():
+    """
+    Returns (read, cleanup). read() gives {pin: 0|1|None} for every pin in
+    GPIO_PINS (1 = open/high with the pull-up, None = unreadable).
+    """
+    if lgpio is not None:
+        try:
+            handle = lgpio.gpiochip_open(0)
+            lgpio.group_claim_input(handle, GPIO_PINS, lgpio.SET_PULL_UP)
+            leader = GPIO_PINS[0]
+
+            def read():
+                # One kernel round-trip for all 26 pins; bit i of the
+                # returned word is the level of GPIO_PINS[i].
+                levels = lgpio.group_read(handle, leader)
+                return {pin: (levels >> i) & 1 for i, pin in enumerate(GPIO_PINS)}
+
+            def cleanup():
+                lgpio.group_free(handle, leader)
+                lgpio.gpiochip_close(handle)
+
+            return read, cleanup
+        except Exception as e:
+            print(f"Warning: lgpio group claim failed ({e}); falling back to gpiozero.")
+
+    from gpiozero import Button
+
     buttons = {}
-    
-    # Initialize all pins
     for pin in GPIO_PINS:
         try:
             # pull_up=True means Open=High (1), Grounded=Low (0)
@@ -20,62 +56,72 @@ def monitor():
             print(f"Warning: Could not initialize GPIO {pin}: {e}")
             buttons[pin] = None
 
+    # Partition once at init: pins that failed to claim stay ERR forever,
+    # so the per-frame loop only touches the working ones.
+    live = [(pin, b) for pin, b in buttons.items() if b is not None]
+    dead = {pin: None for pin, b in buttons.items() if b is None}
+
+    def read():
+        values = dict(dead)
+        for pin, b in live:
+            values[pin] = b.value
+        return values
+
+    def cleanup():
+        for _, b in live:
+            b.close()
+
+    return read, cleanup
+
+
+def monitor():
+    print("Initializing pins... (Ctrl+C to stop)")
+    read, cleanup = _make_reader()
+
     print("\033[2J") # Clear screen once
-    
+
+    def fmt(pin, values):
+        val = values.get(pin)
+        if val is None:
+            return f"GPIO {pin:02d}: ERR "
+        # value 1 means Open (High), 0 means Grounded (Low)
+        # Color: Green for GND (active), Red for OPEN (inactive)
+        if val:
+            return f"GPIO {pin:02d}: {RED}OPEN{RESET}"
+        return f"GPIO {pin:02d}: {GREEN}GND {RESET}"
+
     try:
         while True:
-            # Move cursor to top-left
-            sys.stdout.write("\033[H")
-            
-            print("=== GPIO Pin Monitor ===")
-            print("State: ON = OPEN (Pull-up High), OFF = GROUNDED (Low)")
-            print("-" * 40)
-            
+            values = read()
+
+            # Build the whole screen in one buffer and flush it with a
+            # single write: the terminal repaints once per refresh instead
+            # of line by line, so it never shows a half-drawn frame.
+            lines = ["\033[H=== GPIO Pin Monitor ==="]
+            lines.append("State: ON = OPEN (Pull-up High), OFF = GROUNDED (Low)")
+            lines.append("-" * 40)
+
             # Print in two columns
             col_len = (len(GPIO_PINS) + 1) // 2
-            
+
             for i in range(col_len):
-                # Left column
-                pin1 = GPIO_PINS[i]
-                b1 = buttons.get(pin1)
-                s1 = "ERR "
-                if b1:
-                    # value 1 means Open (High), 0 means Grounded (Low)
-                    val1 = b1.value 
-                    s1 = "OPEN" if val1 else "GND "
-                    # Color: Green for GND (active), Red for OPEN (inactive)
-                    color1 = "\033[92m" if not val1 else "\033[91m"
-                    reset = "\033[0m"
-                    s1 = f"{color1}{s1}{reset}"
-                
-                line = f"GPIO {pin1:02d}: {s1}    "
-                
-                # Right column
+                line = fmt(GPIO_PINS[i], values) + "    "
                 if i + col_len < len(GPIO_PINS):
-                    pin2 = GPIO_PINS[i + col_len]
-                    b2 = buttons.get(pin2)
-                    s2 = "ERR "
-                    if b2:
-                        val2 = b2.value
-                        s2 = "OPEN" if val2 else "GND "
-                        color2 = "\033[92m" if not val2 else "\033[91m"
-                        reset = "\033[0m"
-                        s2 = f"{color2}{s2}{reset}"
-                    line += f"|    GPIO {pin2:02d}: {s2}"
-                
-                print(line + "\033[K") # Clear rest of line
-
-            print("-" * 40)
-            print("Press Ctrl+C to exit.\033[J") # Clear rest of screen below
-            
+                    line += "|    " + fmt(GPIO_PINS[i + col_len], values)
+                lines.append(line + "\033[K") # Clear rest of line
+
+            lines.append("-" * 40)
+            lines.append("Press Ctrl+C to exit.\033[J") # Clear rest of screen below
+
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
             time.sleep(0.1)
-            
+
     except KeyboardInterrupt:
         print("\nStopped.")
     finally:
-        for b in buttons.values():
-            if b:
-                b.close()
+        cleanup()
 
 if __name__ == '__main__':
     monitor()
@@ -7,9 +7,16 @@ from ultralytics import YOLO
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Representative frames for int8 calibration (same directory nodes/yolo.py
+# uses for its on-device exports).
+CALIBRATION_DIR = "data/calibration"
+
 def main():
     parser = argparse.ArgumentParser(description="Export YOLO model to TFLite format.")
     parser.add_argument("--model", type=str, default="yolo11n", help="Name of the model to export (default: yolo11n)")
+    parser.add_argument("--quant", type=str, choices=["none", "fp16", "int8"], default="none",
+                        help="Quantization: fp16 halves the file size, int8 runs ~4x faster "
+                             "on ARM NEON (calibrated against data/calibration when present)")
     args = parser.parse_args()
 
     model_name = args.model
@@ -19,22 +26,37 @@ def main():
 
     try:
         if not os.path.exists(model_file) and not model_name.startswith("yolo"):
-             # If it's a local file that doesn't exist, warn unless it looks like a standard ultralytics model name 
+             # If it's a local file that doesn't exist, warn unless it looks like a standard ultralytics model name
              # which ultralytics will auto-download
              logger.warning(f"Local file {model_file} not found. Ultralytics might try to download it.")
 
         logger.info(f"Loading YOLO model {model_name}...")
         model = YOLO(model_name)
-        
-        logger.info(f"Exporting {model_name} to TFLite format...")
-        model.export(format="tflite")
-        
-        expected_output = f"{model_name.replace('.pt', '')}_float32.tflite" # Standard output name format usually
+
+        export_kwargs = {"format": "tflite"}
+        if args.quant == "fp16":
+            export_kwargs["half"] = True
+        elif args.quant == "int8":
+            export_kwargs["int8"] = True
+            if os.path.isdir(CALIBRATION_DIR):
+                export_kwargs["data"] = CALIBRATION_DIR
+            else:
+                logger.warning(
+                    f"No calibration images in {CALIBRATION_DIR}; "
+                    "int8 ranges will come from Ultralytics' default dataset."
+                )
+
+        logger.info(f"Exporting {model_name} to TFLite format (quant={args.quant})...")
+        exported = model.export(**export_kwargs)
+
         logger.info("Export complete.")
+        if exported and os.path.exists(exported):
+            size_mb = os.path.getsize(exported) / (1024 * 1024)
+            logger.info(f"Wrote {exported} ({size_mb:.1f} MB)")
 
     except Exception as e:
         logger.error(f"Failed to export model: {e}")
         exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 import cv2
+import numpy as np
 import time
 import json
 import os
+import queue
 import shutil
+import threading
+from collections import deque
 from datetime import datetime
 try:
     from dustycam.nodes.sources import create_source
@@ -13,37 +17,260 @@ except ImportError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     from dustycam.nodes.sources import create_source
 
+# io_uring submits a whole burst of JPEG writes with one syscall instead of
+# one blocking write() per file. Optional: without the liburing bindings the
+# writer thread falls back to plain writes.
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+# orjson parses/serializes settings JSON several times faster than stdlib
+# json; optional, same fallback pattern as the pipeline settings store.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# GStreamer records bursts as one H.264 segment through the Pi's V4L2
+# hardware encoder — near-zero CPU and ~10x fewer bytes than per-frame
+# JPEGs. Optional: without it bursts stay on the JPEG path.
+try:
+    import gi
+    gi.require_version('Gst', '1.0')
+    from gi.repository import Gst
+    Gst.init(None)
+except Exception:
+    Gst = None
+
+# Numba fuses the three diffs, thresholds and combine into one pass over the
+# frame (the cv2 chain reads it several times end-to-end through DRAM), with
+# rows parallelized across cores. Optional; cv2 path used without it.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _fused_motion(prev2, prev1, cur, thresh_val, out):
+        h, w = cur.shape
+        for i in prange(h):
+            for j in range(w):
+                a = abs(int(prev2[i, j]) - int(prev1[i, j])) > thresh_val
+                b = abs(int(prev1[i, j]) - int(cur[i, j])) > thresh_val
+                c = abs(int(prev2[i, j]) - int(cur[i, j])) > thresh_val
+                out[i, j] = 255 if (a and b and not c) else 0
+
+    @njit(cache=True, parallel=True)
+    def _dilate3(src, dst):
+        h, w = src.shape
+        for i in prange(h):
+            i0 = i - 1 if i > 0 else 0
+            i1 = i + 1 if i < h - 1 else h - 1
+            for j in range(w):
+                j0 = j - 1 if j > 0 else 0
+                j1 = j + 1 if j < w - 1 else w - 1
+                m = 0
+                for ii in range(i0, i1 + 1):
+                    for jj in range(j0, j1 + 1):
+                        if src[ii, jj] > m:
+                            m = src[ii, jj]
+                dst[i, j] = m
+
 # Defaults
 motion_settings = {
-    "active": True, 
+    "active": True,
     "threshold": 25,
     "min_area": 500,
-    "blur_size": 21
+    "blur_size": 21,
+    "speed_k": 1,  # frame spacing for three-frame differencing
+    "bg_update_every": 3  # refresh the reference frames every Nth frame
 }
 
 SETTINGS_FILE = "motion_settings.json"
 
+# Detection runs on a 4x4-subsampled gray: 16x fewer bytes touched per
+# frame, and the blur/diff/threshold costs shrink proportionally. Only the
+# saved frames stay full resolution.
+DOWNSCALE = 4
+
+# Structuring element for the dilate, built once instead of per frame.
+KERNEL3 = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+
 def load_settings():
     global motion_settings
     if os.path.exists(SETTINGS_FILE):
         try:
-            with open(SETTINGS_FILE, 'r') as f:
-                saved = json.load(f)
-                motion_settings.update(saved)
+            with open(SETTINGS_FILE, 'rb') as f:
+                raw = f.read()
+            saved = orjson.loads(raw) if orjson else json.loads(raw)
+            motion_settings.update(saved)
             print(f"Loaded settings: {motion_settings}")
         except Exception as e:
             print(f"Error loading settings: {e}")
     else:
         print("Settings file not found, using defaults.")
 
+class _H264Recorder:
+    """One motion burst as an H.264/MP4 segment via appsrc + v4l2h264enc."""
+
+    def __init__(self, filepath, width, height, fps=30):
+        caps = (f"video/x-raw,format=BGR,width={width},height={height},"
+                f"framerate={fps}/1")
+        launch = (
+            f"appsrc name=src is-live=true block=true format=time caps={caps} "
+            "! videoconvert ! v4l2h264enc ! h264parse ! mp4mux "
+            f"! filesink location={filepath}"
+        )
+        self._pipeline = Gst.parse_launch(launch)
+        self._src = self._pipeline.get_by_name('src')
+        self._pts = 0
+        self._dur = Gst.SECOND // fps
+        self._pipeline.set_state(Gst.State.PLAYING)
+
+    def push(self, frame):
+        buf = Gst.Buffer.new_wrapped(frame.tobytes())
+        buf.pts = self._pts
+        buf.duration = self._dur
+        self._pts += self._dur
+        self._src.emit('push-buffer', buf)
+
+    def close(self):
+        self._src.emit('end-of-stream')
+        bus = self._pipeline.get_bus()
+        bus.timed_pop_filtered(
+            5 * Gst.SECOND, Gst.MessageType.EOS | Gst.MessageType.ERROR)
+        self._pipeline.set_state(Gst.State.NULL)
+
+
+def _fname(ns):
+    """
+    HHMMSS_microseconds frame filename from a time.time_ns() reading.
+    Integer math plus localtime on the whole seconds skips the datetime
+    object and format-string parse that strftime pays per frame.
+    """
+    s = ns // 1_000_000_000
+    us = (ns % 1_000_000_000) // 1000
+    tm = time.localtime(s)
+    return f"{tm.tm_hour:02d}{tm.tm_min:02d}{tm.tm_sec:02d}_{us:06d}"
+
+
+def _write_batch_uring(items):
+    """
+    Write encoded (filepath, bytes) pairs through one io_uring submission.
+    Returns False (caller falls back to blocking writes) when liburing is
+    missing or the ring fails.
+    """
+    if liburing is None:
+        return False
+    fds = []
+    try:
+        ring = liburing.io_uring()
+        liburing.io_uring_queue_init(len(items), ring, 0)
+        try:
+            iovs = []  # keep buffers alive until completions arrive
+            for filepath, buf in items:
+                fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                fds.append(fd)
+                iov = liburing.iovec(bytes(buf))
+                iovs.append(iov)
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_write(sqe, fd, iov[0].iov_base, iov[0].iov_len, 0)
+            liburing.io_uring_submit(ring)
+            cqe = liburing.io_uring_cqe()
+            for _ in items:
+                liburing.io_uring_wait_cqe(ring, cqe)
+                liburing.io_uring_cqe_seen(ring, cqe)
+        finally:
+            liburing.io_uring_queue_exit(ring)
+        return True
+    except Exception as e:
+        print(f"io_uring write failed ({e}); falling back to blocking writes.")
+        return False
+    finally:
+        for fd in fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def _writer(q, cores=None):
+    """Drain (filepath, image) pairs and write them as JPEG (quality 85)."""
+    if cores:
+        try:
+            # Keep disk writes off the detection core.
+            os.sched_setaffinity(0, cores)
+        except OSError:
+            pass
+    while True:
+        item = q.get()
+        if item is None:
+            return
+        # Burst frames land within milliseconds of each other; gather
+        # whatever is already queued so they go out as one submission.
+        batch = [item]
+        stop = False
+        while len(batch) < 8:
+            try:
+                nxt = q.get_nowait()
+            except queue.Empty:
+                break
+            if nxt is None:
+                stop = True
+                break
+            batch.append(nxt)
+
+        encoded = []
+        for filepath, image in batch:
+            try:
+                ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 85])
+                if ok:
+                    encoded.append((filepath, buf))
+            except Exception as e:
+                print(f"Error encoding {filepath}: {e}")
+
+        if encoded and not _write_batch_uring(encoded):
+            for filepath, buf in encoded:
+                try:
+                    with open(filepath, 'wb') as f:
+                        f.write(buf)
+                except Exception as e:
+                    print(f"Error writing {filepath}: {e}")
+
+        if stop:
+            return
+
+
+def _enqueue_frame(q, filepath, image):
+    """
+    Hand a frame to the writer thread without ever blocking the detection
+    loop: on a full queue the oldest pending frame is dropped. The image is
+    copied because the source may reuse its buffer.
+    """
+    try:
+        q.put_nowait((filepath, image.copy()))
+    except queue.Full:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            pass
+        q.put_nowait((filepath, image.copy()))
+
+
 def create_run_dir():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     run_dir = os.path.join("data", f"run_{timestamp}")
     os.makedirs(run_dir, exist_ok=True)
     
     # Save settings copy
-    with open(os.path.join(run_dir, "settings.json"), 'w') as f:
-        json.dump(motion_settings, f, indent=4)
+    if orjson:
+        data = orjson.dumps(motion_settings, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(motion_settings, indent=4).encode()
+    with open(os.path.join(run_dir, "settings.json"), 'wb') as f:
+        f.write(data)
         
     print(f"Created run directory: {run_dir}")
     return run_dir
@@ -62,13 +289,98 @@ def main():
 
     print("Camera source ready. Waiting for motion...")
     
-    previous_gray = None
+    # Three-frame differencing compares t-2k, t-k and t, so keep the last
+    # 2k blurred grays. Scratch buffers are allocated once the frame size
+    # is known and reused every frame.
+    speed_k = max(1, int(motion_settings.get("speed_k", 1)))
+    grays = deque(maxlen=2 * speed_k)
+
+    # Settings snapshot held in locals: the hot loop would otherwise pay
+    # three dict lookups per frame for values that only change when the
+    # settings file does. Re-read on mtime advance, checked ~once a second.
+    def _settings_snapshot():
+        return (
+            motion_settings.get("blur_size", 21),
+            motion_settings.get("threshold", 25),
+            # min_area is configured in full-res pixels; detection pixels
+            # cover DOWNSCALE^2 of them each.
+            motion_settings.get("min_area", 500) / (DOWNSCALE * DOWNSCALE),
+            max(1, int(motion_settings.get("bg_update_every", 3))),
+        )
+
+    bs, thresh_val, min_area, bg_every = _settings_snapshot()
+    bg_counter = 0
+    try:
+        settings_mtime = os.path.getmtime(SETTINGS_FILE)
+    except OSError:
+        settings_mtime = None
+    frames_since_check = 0
+    diff_bufs = None
+    small_buf = None
+    # 1-D Gaussian kernel, rebuilt only when blur_size changes.
+    blur_kern = None
+    blur_bs = None
     frames_to_record = 0
+
+    # SD-card writes stall 20-100 ms; a writer thread keeps that latency
+    # out of the detection loop so frames aren't dropped mid-burst.
+    # Pin the detection loop to the last core and push the writer onto the
+    # others: migrations blow the L1/L2 lines holding the frame history and
+    # scratch buffers, which dominates a memory-bound loop. SCHED_FIFO keeps
+    # background tasks from preempting mid-frame. All best-effort — affinity
+    # needs >=4 cores to be worth it and FIFO needs CAP_SYS_NICE/root. With
+    # isolcpus=<core> on the kernel cmdline the pinned core is near-private.
+    writer_cores = None
+    try:
+        cores = sorted(os.sched_getaffinity(0))
+        if len(cores) >= 4:
+            writer_cores = set(cores[:-1])
+    except (AttributeError, OSError):
+        cores = []
+
+    write_q = queue.Queue(maxsize=8)
+    writer_thread = threading.Thread(
+        target=_writer, args=(write_q, writer_cores), daemon=True)
+    writer_thread.start()
+
+    if writer_cores:
+        try:
+            os.sched_setaffinity(0, {cores[-1]})
+            print(f"Detection loop pinned to CPU {cores[-1]}.")
+        except OSError as e:
+            print(f"CPU pinning skipped: {e}")
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(50))
+        print("Detection loop running at SCHED_FIFO priority 50.")
+    except (AttributeError, OSError, PermissionError):
+        pass  # needs CAP_SYS_NICE; fine without it
+
+    # H.264 burst recorder plus a two-frame pre-buffer so the segment
+    # includes the frames just before the trigger.
+    recorder = None
+    prebuffer = deque(maxlen=2)
     
-    # GPIO Setup
+    # GPIO Setup: edge callbacks drive a threading.Event, so the loop blocks
+    # zero-CPU while the switch is open instead of polling it, and each
+    # transition logs exactly once.
+    enabled_evt = threading.Event()
+    enabled_evt.set()
     try:
         from gpiozero import Button
         enable_pin = Button(21)
+
+        def _on_enabled():
+            print("Recording enabled (GPIO switch closed).")
+            enabled_evt.set()
+
+        def _on_disabled():
+            print("Recording disabled (GPIO switch open).")
+            enabled_evt.clear()
+
+        enable_pin.when_pressed = _on_enabled
+        enable_pin.when_released = _on_disabled
+        if not enable_pin.is_pressed:
+            enabled_evt.clear()
         print("GPIO 21 initialized for conditional recording.")
         print("  - Switch CLOSED (Grounded) = ENABLED")
         print("  - Switch OPEN = DISABLED")
@@ -81,68 +393,143 @@ def main():
 
     try:
         while True:
-            # Check GPIO Switch
-            if enable_pin and not enable_pin.is_pressed:
-                # Switch is Open (High) -> Disabled
-                # throttle logs
-                if time.time() % 5 < 0.1: 
-                    print("Recording disabled (GPIO Switch OPEN)", end='\r')
-                time.sleep(0.1)
-                continue
-            
-            packet = source.next_packet()
+            # Sleep until the enable switch closes again; reset the frame
+            # history afterwards since the scene may have changed meanwhile.
+            if not enabled_evt.is_set():
+                enabled_evt.wait()
+                grays.clear()
+
+
+            # Blocks on the source's frame event (when it has one) instead
+            # of spinning in a poll/sleep loop while idle.
+            packet = source.next_packet_blocking(0.1)
             if packet is None:
-                time.sleep(0.01)
                 continue
                 
             # If currently recording burst
             if frames_to_record > 0:
-                filename = f"{datetime.now().strftime('%H%M%S_%f')}.jpg"
-                filepath = os.path.join(run_dir, filename)
-                cv2.imwrite(filepath, packet.image)
-                print(f"Recorded frame: {filename}")
+                if recorder is not None:
+                    recorder.push(packet.image)
+                else:
+                    filename = f"{_fname(time.time_ns())}.jpg"
+                    filepath = os.path.join(run_dir, filename)
+                    _enqueue_frame(write_q, filepath, packet.image)
+                    print(f"Recorded frame: {filename}")
                 frames_to_record -= 1
                 if frames_to_record == 0:
+                    if recorder is not None:
+                        recorder.close()
+                        recorder = None
                     print("Burst complete. Waiting for motion...")
-                    previous_gray = None # Reset background to adapt to potentially new scene state
+                    grays.clear() # Reset history to adapt to potentially new scene state
                 continue
 
             # Motion Detection Logic
             try:
+                frames_since_check += 1
+                if frames_since_check >= 30:
+                    frames_since_check = 0
+                    try:
+                        mtime = os.path.getmtime(SETTINGS_FILE)
+                    except OSError:
+                        mtime = None
+                    if mtime != settings_mtime:
+                        settings_mtime = mtime
+                        load_settings()
+                        bs, thresh_val, min_area, bg_every = _settings_snapshot()
+
                 gray = cv2.cvtColor(packet.image, cv2.COLOR_BGR2GRAY)
-                bs = motion_settings.get("blur_size", 21)
-                gray = cv2.GaussianBlur(gray, (bs, bs), 0)
-                
-                if previous_gray is None:
-                    previous_gray = gray
+                h, w = gray.shape
+                dsize = (w // DOWNSCALE, h // DOWNSCALE)
+                if small_buf is None or small_buf.shape != (dsize[1], dsize[0]):
+                    small_buf = np.empty((dsize[1], dsize[0]), np.uint8)
+                cv2.resize(gray, dsize, dst=small_buf, interpolation=cv2.INTER_AREA)
+                if bs != blur_bs:
+                    blur_bs = bs
+                    blur_kern = cv2.getGaussianKernel(bs, 0).astype(np.float32)
+                # sepFilter2D with the cached kernel skips GaussianBlur's
+                # per-call coefficient setup. The blurred gray enters the
+                # history deque, so it needs a fresh array per frame (16x
+                # smaller than full res).
+                gray = cv2.sepFilter2D(small_buf, cv2.CV_8U, blur_kern, blur_kern)
+
+                if len(grays) < grays.maxlen:
+                    grays.append(gray)
                     continue
-                    
-                frame_delta = cv2.absdiff(previous_gray, gray)
-                previous_gray = gray
-                
-                thresh_val = motion_settings.get("threshold", 25)
-                thresh = cv2.threshold(frame_delta, thresh_val, 255, cv2.THRESH_BINARY)[1]
-                thresh = cv2.dilate(thresh, None, iterations=2)
-                contours, _ = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                
-                motion_detected = False
-                min_area = motion_settings.get("min_area", 500)
-                
-                for c in contours:
-                    if cv2.contourArea(c) > min_area:
-                        motion_detected = True
-                        break
-                
+                prev2, prev1 = grays[0], grays[speed_k]
+
+                if diff_bufs is None or diff_bufs[0].shape != gray.shape:
+                    diff_bufs = tuple(np.empty_like(gray) for _ in range(4))
+                diff_a, diff_b, diff_c, combined = diff_bufs
+
+                # Motion at the current frame must show up in both the
+                # (t-2k, t-k) and (t-k, t) diffs but not persist across
+                # (t-2k, t): d_a & d_b & ~d_c. This rejects the jitter and
+                # lighting drift a plain two-frame absdiff triggers on.
+                if njit is not None:
+                    # Fused kernel: one pass for diff+threshold+combine,
+                    # then two 3x3 max passes for the dilate.
+                    _fused_motion(prev2, prev1, gray, thresh_val, combined)
+                    _dilate3(combined, diff_a)
+                    _dilate3(diff_a, combined)
+                else:
+                    cv2.absdiff(prev2, prev1, dst=diff_a)
+                    cv2.absdiff(prev1, gray, dst=diff_b)
+                    cv2.absdiff(prev2, gray, dst=diff_c)
+                    cv2.threshold(diff_a, thresh_val, 255, cv2.THRESH_BINARY, dst=diff_a)
+                    cv2.threshold(diff_b, thresh_val, 255, cv2.THRESH_BINARY, dst=diff_b)
+                    cv2.threshold(diff_c, thresh_val, 255, cv2.THRESH_BINARY, dst=diff_c)
+                    cv2.bitwise_and(diff_a, diff_b, dst=combined)
+                    cv2.bitwise_not(diff_c, dst=diff_c)
+                    cv2.bitwise_and(combined, diff_c, dst=combined)
+                    # In-place dilate into the combined buffer with a
+                    # kernel built once at import.
+                    cv2.dilate(combined, KERNEL3, dst=combined, iterations=2)
+
+                # connectedComponentsWithStats hands back every blob's pixel
+                # area as a numpy column, so the size gate is one vectorized
+                # comparison instead of a Python loop over contours (row 0
+                # is the background label).
+                n, _, stats, _ = cv2.connectedComponentsWithStats(combined, connectivity=8)
+                motion_detected = n > 1 and bool((stats[1:, cv2.CC_STAT_AREA] > min_area).any())
+
+                # The reference frames don't need refreshing every frame —
+                # only every bg_update_every-th one, plus immediately when
+                # motion fires so the diffs aren't stale as the burst ends.
+                bg_counter += 1
+                if motion_detected or bg_counter >= bg_every:
+                    grays.append(gray)
+                    bg_counter = 0
+
+
                 if motion_detected:
                     print("Motion Detected!")
-                    # Save current frame (Trigger)
-                    filename = f"{datetime.now().strftime('%H%M%S_%f')}_TRIGGER.jpg"
-                    filepath = os.path.join(run_dir, filename)
-                    cv2.imwrite(filepath, packet.image)
-                    print(f"Recorded trigger frame: {filename}")
-                    
+                    if Gst is not None:
+                        try:
+                            fh, fw = packet.image.shape[:2]
+                            filepath = os.path.join(
+                                run_dir, f"{_fname(time.time_ns())}.mp4")
+                            recorder = _H264Recorder(filepath, fw, fh)
+                            for pre in prebuffer:
+                                recorder.push(pre)
+                            recorder.push(packet.image)
+                            print(f"Recording H.264 segment: {filepath}")
+                        except Exception as e:
+                            print(f"H.264 recorder failed ({e}); using JPEGs.")
+                            recorder = None
+                    if recorder is None:
+                        # Save current frame (Trigger)
+                        filename = f"{_fname(time.time_ns())}_TRIGGER.jpg"
+                        filepath = os.path.join(run_dir, filename)
+                        _enqueue_frame(write_q, filepath, packet.image)
+                        print(f"Recorded trigger frame: {filename}")
+
                     # Record next 2 frames
                     frames_to_record = 2
+                elif Gst is not None:
+                    # Keep pre-motion context for the next segment; the
+                    # source may reuse its buffer, so copy.
+                    prebuffer.append(packet.image.copy())
                     
             except Exception as e:
                 print(f"Error in processing loop: {e}")
@@ -150,6 +537,11 @@ def main():
 
     except KeyboardInterrupt:
         print("\nStopping...")
+    finally:
+        if recorder is not None:
+            recorder.close()
+        write_q.put(None)
+        writer_thread.join(timeout=5)
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,38 @@
 import time
 import psutil
 import csv
+import fcntl
+import os
+import struct
 import subprocess
 from datetime import datetime
 
 # CONFIG
 LOG_FILE = "crash_log.csv"
 
+# VideoCore mailbox state: the /dev/vcio fd is opened once and kept; if the
+# mailbox is unusable (non-Pi, permissions) we stop retrying and every
+# sample falls back to the vcgencmd fork.
+_VCIO_FD = None
+_VCIO_FAILED = False
+
+def _mailbox_throttled():
+    """Throttled flags via the VideoCore mailbox, or None if unavailable."""
+    global _VCIO_FD, _VCIO_FAILED
+    if _VCIO_FAILED:
+        return None
+    try:
+        if _VCIO_FD is None:
+            _VCIO_FD = os.open("/dev/vcio", os.O_RDWR)
+        # Property request: size, code, tag 0x30046 (get throttled),
+        # value size, request code, value buffer, end tag.
+        buf = bytearray(struct.pack('9I', 36, 0, 0x00030046, 8, 0, 0, 0, 0, 0))
+        fcntl.ioctl(_VCIO_FD, 0xC0046400, buf)
+        return hex(struct.unpack('9I', bytes(buf))[5])
+    except Exception:
+        _VCIO_FAILED = True
+        return None
+
 def get_cpu_temp():
     try:
         with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
@@ -15,7 +41,12 @@ def get_cpu_temp():
         return 0.0
 
 def get_throttled_state():
-    # Uses the Pi's internal vcgencmd tool to check for power issues
+    # One ioctl on the cached /dev/vcio fd instead of forking vcgencmd
+    # (fork/execve plus its startup costs several ms per sample).
+    flags = _mailbox_throttled()
+    if flags is not None:
+        return flags
+    # Fallback: the Pi's vcgencmd tool
     try:
         output = subprocess.check_output(["vcgencmd", "get_throttled"]).decode()
         # Output looks like "throttled=0x50005"
@@ -23,10 +54,22 @@ def get_throttled_state():
     except:
         return "N/A"
 
+# Throttled-flag bits: active status in bits 0-3, past events in 16-19.
+_THROTTLE_BITS = (
+    (0, "Under-voltage detected"),
+    (1, "Arm frequency capped"),
+    (2, "Currently throttled"),
+    (3, "Soft temp limit active"),
+    (16, "Under-voltage has occurred"),
+    (17, "Arm frequency capping has occurred"),
+    (18, "Throttling has occurred"),
+    (19, "Soft temp limit has occurred"),
+)
+
 def decode_throttled_meaning(hex_code):
     if hex_code == "N/A":
         return "Unknown"
-    
+
     try:
         # Handle 0x prefix if present
         code = int(hex_code, 16)
@@ -36,32 +79,26 @@ def decode_throttled_meaning(hex_code):
     if code == 0:
         return "OK"
 
-    messages = []
-    
-    # Active Status (Bits 0-3)
-    if code & (1 << 0): messages.append("Under-voltage detected")
-    if code & (1 << 1): messages.append("Arm frequency capped")
-    if code & (1 << 2): messages.append("Currently throttled")
-    if code & (1 << 3): messages.append("Soft temp limit active")
-    
-    # Past Events (Bits 16-19)
-    if code & (1 << 16): messages.append("Under-voltage has occurred")
-    if code & (1 << 17): messages.append("Arm frequency capping has occurred")
-    if code & (1 << 18): messages.append("Throttling has occurred")
-    if code & (1 << 19): messages.append("Soft temp limit has occurred")
-    
+    messages = [msg for bit, msg in _THROTTLE_BITS if code & (1 << bit)]
+
     # Specific user request clarifications
-    if (code & (1 << 16)): # Under-voltage occurred
+    if code & (1 << 16): # Under-voltage occurred
         messages.append("(Power supply dipped below 4.63V)")
 
     return "; ".join(messages)
 
 print(f"Logging telemetry to {LOG_FILE}...")
 
-with open(LOG_FILE, "w", newline="") as f:
+# Line buffering pushes each row to the OS as it's written, so no explicit
+# flush() per iteration. flush() alone never guaranteed persistence anyway —
+# only fsync does — so the rows are synced to disk every FSYNC_EVERY samples.
+FSYNC_EVERY = 10
+
+with open(LOG_FILE, "w", newline="", buffering=1) as f:
     writer = csv.writer(f)
     writer.writerow(["Timestamp", "CPU_Temp_C", "RAM_Used_MB", "RAM_Percent", "CPU_Percent", "Throttled_Hex", "Throttled_Meaning"])
 
+    rows_since_sync = 0
     while True:
         try:
             # 1. Gather Stats
@@ -72,20 +109,23 @@ with open(LOG_FILE, "w", newline="") as f:
             throttled_meaning = decode_throttled_meaning(throttled_hex)
             timestamp = datetime.now().strftime("%H:%M:%S")
 
-            # 2. Log to CSV
+            # 2. Log to CSV (line buffering hands it to the OS immediately)
             row = [timestamp, temp, ram.used >> 20, ram.percent, cpu_usage, throttled_hex, throttled_meaning]
             writer.writerow(row)
-            
-            # 3. CRITICAL: Flush to disk immediately
-            # If we don't flush, the data stays in RAM and disappears when power cuts.
-            f.flush()
-            
+
+            # 3. Periodic fsync: survives a power cut up to FSYNC_EVERY
+            # seconds of data, without paying a disk sync every sample.
+            rows_since_sync += 1
+            if rows_since_sync >= FSYNC_EVERY:
+                os.fsync(f.fileno())
+                rows_since_sync = 0
+
             # Print specifically high values to console for quick spotting
             if temp > 80 or ram.percent > 90:
                 print(f"WARNING: Temp={temp}C, RAM={ram.percent}%")
-                
+
             time.sleep(1)
-            
+
         except KeyboardInterrupt:
             print("Stopping telemetry.")
             break
\ No newline at end of file
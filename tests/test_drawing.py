@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+
+from dustycam.frame import DetectionArray, FramePacket
+from dustycam.nodes.drawing import DrawAndEncodeNode
+
+
+def _packet_with_box():
+    img = np.zeros((64, 64, 3), dtype=np.uint8)
+    return img, FramePacket(
+        frame_id=0, timestamp=0, image=img,
+        detections=[{'bbox': (8, 8, 40, 40), 'conf': 0.9, 'cls': 0, 'label': 'car'}],
+    )
+
+
+def test_draw_and_encode_leaves_source_frame_untouched():
+    # Sources reuse frame buffers (see the SourceNode contract), so the node
+    # must annotate a copy: the packet image has to come back bit-identical.
+    img, packet = _packet_with_box()
+    before = img.copy()
+
+    node = DrawAndEncodeNode()
+    out = node.forward(packet)
+
+    assert out is packet
+    assert np.array_equal(packet.image, before)
+
+    encoded = node.get_last_frame_bytes()
+    assert encoded
+    decoded = cv2.imdecode(np.frombuffer(encoded, np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == img.shape
+    # The box was drawn into the encoded frame, not the source one.
+    assert decoded.any()
+
+
+def test_draw_and_encode_detection_array_path():
+    img, packet = _packet_with_box()
+    packet.det_array = DetectionArray(
+        bbox=np.array([[8, 8, 40, 40]], dtype=np.int32),
+        confidence=np.array([0.9], dtype=np.float32),
+        class_id=np.array([0], dtype=np.int32),
+        labels=['car'],
+    )
+    before = img.copy()
+
+    node = DrawAndEncodeNode()
+    node.forward(packet)
+
+    assert np.array_equal(packet.image, before)
+    assert node.get_last_frame_bytes()
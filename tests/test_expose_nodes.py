@@ -18,7 +18,7 @@ class MockSource(Node):
     def next_packet(self):
         self.frame_count += 1
         img = np.zeros((100, 100, 3), dtype=np.uint8)
-        return FramePacket(frame_id=self.frame_count, timestamp=0.0, image=img)
+        return FramePacket(frame_id=self.frame_count, timestamp=0, image=img)
         
     def forward(self, packet):
         return packet
@@ -43,9 +43,12 @@ def test_expose_nodes_via_runner():
 from dustycam.node import SourceNode, SinkNode
 
 class RealMockSource(SourceNode):
+    def __init__(self):
+        super().__init__()
+        # One buffer for all packets, per the SourceNode reuse contract
+        self._buf = np.zeros((100, 100, 3), dtype=np.uint8)
     def next_packet(self):
-        img = np.zeros((100, 100, 3), dtype=np.uint8)
-        return FramePacket(frame_id=1, timestamp=0.0, image=img)
+        return FramePacket(frame_id=1, timestamp=0, image=self._buf)
     def forward(self, packet): return packet
 
 def test_runner_updates_latest_packet():
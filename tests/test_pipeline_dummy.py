@@ -3,6 +3,7 @@ from dustycam.node import SourceNode, Node, SinkNode
 from dustycam.runner import Runner
 
 import numpy as np
+import pytest
 
 
 class DummySource(SourceNode):
@@ -10,12 +11,13 @@ class DummySource(SourceNode):
         super().__init__(name="DummySource")
         self._counter = 0
         self._n = n
+        # One buffer for all packets, per the SourceNode reuse contract
+        self._buf = np.zeros((8, 8, 3), dtype=np.uint8)
 
     def next_packet(self):
         if self._counter >= self._n:
             return None
-        img = np.zeros((8, 8, 3), dtype=np.uint8)
-        pkt = FramePacket(frame_id=self._counter, timestamp=float(self._counter), image=img)
+        pkt = FramePacket(frame_id=self._counter, timestamp=self._counter, image=self._buf)
         self._counter += 1
         return pkt
 
@@ -26,14 +28,15 @@ class DummySource(SourceNode):
 class A(Node):
     def forward(self, packet: FramePacket) -> FramePacket:
         pkt = packet.copy_shallow()
-        pkt.ocr_results.append("x")
+        # copy_shallow shares lists; claim a private copy before mutating
+        pkt._mut_ocr().append("x")
         return pkt
 
 
 class B(Node):
     def forward(self, packet: FramePacket) -> FramePacket:
         pkt = packet.copy_shallow()
-        pkt.ocr_results.append("y")
+        pkt._mut_ocr().append("y")
         return pkt
 
 
@@ -49,6 +52,40 @@ class CollectSink(SinkNode):
         self.received.append(packet.ocr_results)
 
 
+class BatchNode(Node):
+    """Buffers packets and releases them as a list, like a batching detector."""
+
+    def __init__(self, batch_size=3):
+        super().__init__(name="BatchNode")
+        self.batch_size = batch_size
+        self._pending = []
+
+    def forward(self, packet: FramePacket):
+        self._pending.append(packet)
+        if len(self._pending) < self.batch_size:
+            return None
+        released, self._pending = self._pending, []
+        return released
+
+    def flush(self):
+        if not self._pending:
+            return None
+        released, self._pending = self._pending, []
+        return released
+
+
+class IdSink(SinkNode):
+    def __init__(self):
+        super().__init__(name="IdSink")
+        self.frame_ids = []
+
+    def forward(self, packet: FramePacket) -> FramePacket:
+        return packet
+
+    def consume(self, packet: FramePacket) -> None:
+        self.frame_ids.append(packet.frame_id)
+
+
 def test_dummy_chain_runs():
     src = DummySource(n=2)
     a = A()
@@ -61,3 +98,47 @@ def test_dummy_chain_runs():
         pass
 
     assert sink.received == [["x", "y"], ["x", "y"]]
+
+
+def test_batch_release_preserves_frame_order():
+    # Batch releases must reach downstream nodes oldest-first, and the
+    # last stored packet (what previews read) must be the newest one.
+    src = DummySource(n=6)
+    batcher = BatchNode(batch_size=3)
+    sink = IdSink()
+
+    src.connect(batcher).connect(sink)
+    runner = Runner([src], [sink])
+    while runner.run_once():
+        pass
+
+    assert sink.frame_ids == [0, 1, 2, 3, 4, 5]
+    assert sink.get_last_packet().frame_id == 5
+
+
+def test_runner_rejects_undersized_inflight_cap():
+    src = DummySource(n=1)
+    batcher = BatchNode(batch_size=9)
+    sink = IdSink()
+    src.connect(batcher).connect(sink)
+    with pytest.raises(ValueError):
+        Runner([src], [sink], max_inflight=4)
+
+
+def test_backpressure_gate_drains_partial_batches():
+    # Two batching stages can park max_inflight packets between them with
+    # neither ready to release; the gate must then force the partial
+    # batches out (not stall) and every frame must still reach the sink
+    # in order.
+    src = DummySource(n=5)
+    b1 = BatchNode(batch_size=3)
+    b2 = BatchNode(batch_size=4)
+    sink = IdSink()
+
+    src.connect(b1).connect(b2).connect(sink)
+    runner = Runner([src], [sink], max_inflight=4)
+    while runner.run_once():
+        pass
+    runner.stop()
+
+    assert sink.frame_ids == [0, 1, 2, 3, 4]
@@ -1,40 +1,142 @@
 
 import os
+import sys
 import time
 import pytest
 import numpy as np
 import cv2
 from dustycam.frame import FramePacket
 from dustycam.nodes.detectors.yolo import YoloNode
+from dustycam.utils.fastjpeg import imread_fast
+
+# Pin the OpenCV and PyTorch thread pools before any parallel work runs.
+# Both default to one thread per core; together (plus OpenMP inside each)
+# they oversubscribe the box and the resulting context-switch thrash adds
+# enough run-to-run noise to hide real perf regressions.
+_BENCH_THREADS = min(4, os.cpu_count() or 4)
+os.environ.setdefault("OMP_NUM_THREADS", str(_BENCH_THREADS))
+cv2.setNumThreads(int(os.environ.get("OCV_THREADS", _BENCH_THREADS)))
+try:
+    import torch
+    torch.set_num_threads(_BENCH_THREADS)
+    torch.set_num_interop_threads(2)
+except (ImportError, RuntimeError):
+    # set_num_interop_threads raises if torch already started parallel work
+    pass
 
 # Check if we are potentially on a CI/headless env where we might skip heavy inference tests if needed
 # But for this task, we want to run it.
 
+# Session-scoped scratch dir for the memmapped dummy frame and encoded
+# bench JPEGs. Filled in by the autouse fixture below, so no file I/O
+# happens at import time and concurrent runs never collide on a fixed
+# world-readable /tmp path.
+_TMP_DIR = None
+_DUMMY = None
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _scratch_dir(tmp_path_factory):
+    global _TMP_DIR
+    _TMP_DIR = tmp_path_factory.mktemp("dustycam")
+    return _TMP_DIR
+
+
+def _dummy_image():
+    """Fallback dummy frame, drawn once per session and memory-mapped:
+    every caller shares the same read-only on-disk pages instead of
+    allocating and re-drawing a 640x640x3 array per call."""
+    global _DUMMY
+    if _DUMMY is None:
+        arr = np.memmap(str(_TMP_DIR / "dummy.npy"), dtype=np.uint8,
+                        mode="w+", shape=(640, 640, 3))
+        arr[:] = 0
+        cv2.rectangle(arr, (100, 100), (300, 300), (255, 255, 255), -1)
+        arr.flags.writeable = False
+        _DUMMY = arr
+    return _DUMMY
+
+
 def get_test_image():
-    # Attempt to load a real image, or create a dummy one if network/file missing
+    # Attempt to load a real image, or fall back to the shared mmap'd dummy
+    # (a white square; YOLO may detect nothing, but the code path runs).
     img_path = "data/carandplate.jpg"
     if os.path.exists(img_path):
-        return cv2.imread(img_path)
-    
-    # Fallback: create a dummy image with a square (simple shape might not be detected by YOLO but ensures code runs)
-    img = np.zeros((640, 640, 3), dtype=np.uint8)
-    cv2.rectangle(img, (100, 100), (300, 300), (255, 255, 255), -1)
-    return img
+        # imread_fast decodes from the mmap'd page cache (turbojpeg or
+        # cv2.imdecode) instead of cv2.imread's stdio read-and-copy.
+        return imread_fast(img_path)
 
-def test_yolo_node_desktop_run():
-    """Verify YoloNode loads and runs on desktop without crashing."""
+    dummy = _dummy_image()
+    # cv2.resize and friends copy non-contiguous inputs, which would defeat
+    # the zero-copy reuse.
+    assert dummy.flags['C_CONTIGUOUS']
+    return dummy
+
+@pytest.fixture(scope="session")
+def warm_yolo():
+    """Session-scoped YoloNode warmed past first-call costs.
+
+    The first forward pays eager-mode tracing and cuDNN autotune
+    (cudnnFind); three dummy invocations up front lock in the algorithm
+    choice so measured latencies reflect steady state. channels_last
+    steers cuDNN toward the faster NHWC tensor-core kernels.
+    """
     try:
         from ultralytics import YOLO
     except ImportError:
-        pytest.skip("Ultralytics not installed, skipping desktop YOLO test")
+        pytest.skip("Ultralytics not installed, skipping YOLO tests")
 
     node = YoloNode(model_name="yolov8n")
-    
-    # Create packet
-    img = get_test_image()
+    try:
+        import torch
+        torch.backends.cudnn.benchmark = True
+        node._model.model.to(memory_format=torch.channels_last)
+    except (ImportError, AttributeError):
+        pass
+
+    dummy = np.zeros((640, 640, 3), dtype=np.uint8)
+    for i in range(3):
+        node.forward(FramePacket(frame_id=-1 - i, timestamp=time.perf_counter_ns(), image=dummy))
+    return node
+
+
+def _build_engine():
+    """Export yolov8n to a TensorRT FP16 engine once and cache it under data/."""
+    from ultralytics import YOLO
+    engine_path = "data/yolov8n_fp16.engine"
+    if not os.path.exists(engine_path):
+        os.makedirs("data", exist_ok=True)
+        exported = YOLO("yolov8n.pt").export(format="engine", half=True, imgsz=640)
+        os.replace(exported, engine_path)
+    return engine_path
+
+
+@pytest.mark.parametrize("img_kind", ["file", "dummy"])
+@pytest.mark.parametrize("backend", ["pt", "engine"])
+def test_yolo_node_desktop_run(backend, img_kind, warm_yolo):
+    """Verify YoloNode loads and runs on desktop without crashing.
+
+    Parametrized over the eager PyTorch model and the TensorRT FP16 engine
+    so a regression in either path is caught; the engine variant doubles as
+    a realistic perf smoke check (fused conv+BN, tensor-core kernels).
+    """
+    if backend == "engine":
+        try:
+            import torch
+        except ImportError:
+            pytest.skip("torch not installed, skipping TensorRT backend")
+        if not torch.cuda.is_available():
+            pytest.skip("CUDA required for the TensorRT engine backend")
+        node = YoloNode(model_name=_build_engine())
+    else:
+        node = warm_yolo
+
+    # Create packet; the shared node makes extra image variants nearly
+    # free, so cover both the real photo and the synthetic frame.
+    img = get_test_image() if img_kind == "file" else _dummy_image()
     packet = FramePacket(
         frame_id=1,
-        timestamp=time.time(),
+        timestamp=time.perf_counter_ns(),
         image=img
     )
 
@@ -46,10 +148,471 @@ def test_yolo_node_desktop_run():
     
     # If we used the real car image, we expect some detections (car, license plate etc)
     # But strictly, we just verified it ran.
-    # Let's inspect contents if possible
+    # Dump straight from the SoA arrays in one vectorized format pass —
+    # a per-detection print loop pays an f-string and dict unpack per box.
     print(f"Detections found: {len(result_packet.detections)}")
-    for d in result_packet.detections:
-        print(d)
+    da = result_packet.det_array
+    if da is not None and len(da):
+        np.savetxt(sys.stdout, np.column_stack([da.class_id, da.confidence, da.bbox]),
+                   fmt='%g', header='cls conf x1 y1 x2 y2')
+
+def _resize_one(path):
+    """Decode + resize one image; module-level so the process pool can pickle it."""
+    img = imread_fast(path)
+    return cv2.resize(img, (640, 640), interpolation=cv2.INTER_LINEAR)
+
+
+def preprocess_batch(paths, workers=None):
+    """Decode and resize `paths` across a process pool.
+
+    Decode+resize is pure CPU work that the GIL serializes in threads;
+    worker processes use all cores while the GPU chews the previous batch.
+    Returns one stacked (N, 640, 640, 3) uint8 array.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.stack(list(pool.map(_resize_one, paths, chunksize=4)))
+
+
+def _bench_image_paths(n=8):
+    """Paths to at least `n` JPEGs: data/*.jpg, or encoded dummies in /tmp."""
+    import glob
+    paths = sorted(glob.glob("data/*.jpg"))
+    if not paths:
+        bench_dir = _TMP_DIR / "bench"
+        bench_dir.mkdir(exist_ok=True)
+        path = str(bench_dir / "dummy.jpg")
+        if not os.path.exists(path):
+            cv2.imwrite(path, get_test_image())
+        paths = [path]
+    while len(paths) < n:
+        paths = paths + paths
+    return paths[:n]
+
+
+def test_yolo_node_batch_throughput(warm_yolo):
+    """Batched forward returns one packet per input and reports per-image cost.
+
+    batch=1 GPU utilization is typically well under 20%; stacking 8 frames
+    into one model call amortizes launch and dispatch overhead. Preprocessing
+    goes through the process pool and must not cost much more than the
+    serial decode+resize of the same files.
+    """
+    paths = _bench_image_paths(8)
+
+    # Serial baseline vs pooled preprocessing of the same files.
+    start = time.perf_counter()
+    for p in paths:
+        _resize_one(p)
+    serial = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = preprocess_batch(paths)
+    pooled = time.perf_counter() - start
+    assert batch.shape == (8, 640, 640, 3)
+    print(f"Preprocess: serial {serial * 1000:.1f} ms, pooled {pooled * 1000:.1f} ms")
+    # Pool spin-up overhead dominates tiny batches, so allow generous slack;
+    # the point is that pooling never degrades to worse-than-serial-by-far.
+    assert pooled < serial * 1.3 + 1.0
+
+    node = warm_yolo
+
+    def make_packets():
+        return [FramePacket(frame_id=i, timestamp=time.perf_counter_ns(), image=batch[i])
+                for i in range(8)]
+
+    # Warmup: first calls pay model tracing / cudnn autotune costs.
+    for _ in range(5):
+        node.forward_batch(make_packets())
+
+    iters = 20
+    start = time.perf_counter()
+    for _ in range(iters):
+        results = node.forward_batch(make_packets())
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 8
+    assert all(isinstance(p.detections, list) for p in results)
+    print(f"Batched throughput: {elapsed / (iters * 8) * 1000:.2f} ms/image")
+
+
+def test_yolo_node_stream_pipeline(warm_yolo):
+    """forward_stream runs 32 frames through one fused predict call.
+
+    Per-frame forward re-enters Python between preprocess, inference and
+    NMS; predict(stream=True) keeps the three stages inside Ultralytics'
+    loop and only surfaces Results as they are consumed, so throughput
+    should match or beat the per-frame path.
+    """
+    img = get_test_image()
+    n_frames = 32
+    packets = (FramePacket(frame_id=i, timestamp=time.perf_counter_ns(), image=img)
+               for i in range(n_frames))
+
+    start = time.perf_counter()
+    out = list(warm_yolo.forward_stream(packets))
+    elapsed = time.perf_counter() - start
+
+    assert len(out) == n_frames
+    assert [p.frame_id for p in out] == list(range(n_frames))
+    assert all(isinstance(p.detections, list) for p in out)
+    print(f"Streamed pipe: {elapsed / n_frames * 1000:.2f} ms/frame")
+
+
+def test_yolo_node_async_pipeline():
+    """Reader -> inference -> validator staged over bounded asyncio queues.
+
+    Running acquisition, inference and checks serially leaves I/O and the
+    model idle in turns; with frames in flight the end-to-end latency
+    approaches the slowest stage instead of their sum. Inference runs in an
+    executor so PyTorch never blocks the event loop.
+    """
+    try:
+        from ultralytics import YOLO
+    except ImportError:
+        pytest.skip("Ultralytics not installed, skipping async pipeline test")
+    import asyncio
+
+    node = YoloNode(model_name="yolov8n")
+    img = get_test_image()
+    n_frames = 8
+    validated = []
+
+    async def producer(out_q):
+        for i in range(n_frames):
+            pkt = FramePacket(frame_id=i, timestamp=time.perf_counter_ns(), image=img)
+            await out_q.put(pkt)
+        await out_q.put(None)
+
+    async def detector(in_q, out_q):
+        loop = asyncio.get_running_loop()
+        while True:
+            pkt = await in_q.get()
+            if pkt is None:
+                await out_q.put(None)
+                return
+            result = await loop.run_in_executor(None, node.forward, pkt)
+            await out_q.put(result)
+
+    async def consumer(in_q):
+        while True:
+            pkt = await in_q.get()
+            if pkt is None:
+                return
+            assert isinstance(pkt.detections, list)
+            validated.append(pkt.frame_id)
+
+    async def run_pipeline():
+        q1 = asyncio.Queue(maxsize=4)
+        q2 = asyncio.Queue(maxsize=4)
+        start = time.perf_counter()
+        await asyncio.gather(producer(q1), detector(q1, q2), consumer(q2))
+        elapsed = time.perf_counter() - start
+        print(f"Async pipeline: {elapsed / n_frames * 1000:.2f} ms/frame end-to-end")
+
+    asyncio.run(run_pipeline())
+    assert validated == list(range(n_frames))
+
+
+def get_test_image_gpu():
+    """Decode the test JPEG straight into GPU memory (nvJPEG) and return a
+    float32 CHW tensor in [0,1] at 640x640 — the FramePacket.image_cuda
+    contract. Returns None when the real image is missing."""
+    import torch
+    from torchvision.io import read_file, decode_jpeg
+
+    img_path = "data/carandplate.jpg"
+    if not os.path.exists(img_path):
+        return None
+    raw = read_file(img_path)
+    # decode_jpeg(device='cuda') never materializes the pixels on the host
+    rgb = decode_jpeg(raw, device="cuda")
+    rgb = torch.nn.functional.interpolate(
+        rgb.unsqueeze(0).float(), size=(640, 640), mode="bilinear",
+        align_corners=False)
+    return (rgb / 255.0).squeeze(0)
+
+
+def test_yolo_node_gpu_decode():
+    """GPU-resident frames (image_cuda) run without a host round-trip.
+
+    cv2.imread + the node's own H2D upload cost two copies per frame;
+    decoding with nvJPEG leaves the pixels on the device and YoloNode feeds
+    the tensor straight into the model.
+    """
+    try:
+        from ultralytics import YOLO
+        import torch
+        import torchvision  # noqa: F401 - provides the nvJPEG decode op
+    except ImportError:
+        pytest.skip("torch/torchvision/ultralytics not installed, skipping GPU decode test")
+    if not torch.cuda.is_available():
+        pytest.skip("CUDA required for GPU-resident decode test")
+
+    tensor = get_test_image_gpu()
+    if tensor is None:
+        pytest.skip("data/carandplate.jpg not present")
+    assert tensor.is_cuda
+
+    node = YoloNode(model_name="yolov8n")
+    packet = FramePacket(frame_id=1, timestamp=time.perf_counter_ns(), image_cuda=tensor)
+    result = node.forward(packet)
+
+    assert isinstance(result.detections, list)
+    print(f"GPU-decode detections: {len(result.detections)}")
+
+
+def _build_int8_onnx():
+    """Export yolov8n to an INT8-calibrated ONNX once, cached under data/."""
+    from ultralytics import YOLO
+    path = "data/yolov8n_int8.onnx"
+    if not os.path.exists(path):
+        os.makedirs("data", exist_ok=True)
+        exported = YOLO("yolov8n.pt").export(format="onnx", int8=True, data="coco8.yaml")
+        os.replace(exported, path)
+    return path
+
+
+def test_yolo_node_int8_run():
+    """INT8 ONNX backend runs and stays close to FP32.
+
+    INT8 dot-product instructions (VNNI/NEON) run ~2-4x faster than FP32,
+    but a bad calibration silently drops boxes — so compare the detection
+    count on the same image against the FP32 model within +-1 box.
+    """
+    try:
+        from ultralytics import YOLO
+    except ImportError:
+        pytest.skip("Ultralytics not installed, skipping INT8 ONNX test")
+    try:
+        import onnxruntime  # noqa: F401 - AutoBackend needs it for .onnx
+    except ImportError:
+        pytest.skip("onnxruntime not installed, skipping INT8 ONNX test")
+
+    img = get_test_image()
+
+    fp32_node = YoloNode(model_name="yolov8n")
+    fp32_packet = fp32_node.forward(
+        FramePacket(frame_id=1, timestamp=time.perf_counter_ns(), image=img))
+
+    int8_node = YoloNode(model_name=_build_int8_onnx())
+    int8_packet = int8_node.forward(
+        FramePacket(frame_id=2, timestamp=time.perf_counter_ns(), image=img))
+
+    assert isinstance(int8_packet.detections, list)
+    drift = abs(len(int8_packet.detections) - len(fp32_packet.detections))
+    print(f"FP32: {len(fp32_packet.detections)} boxes, "
+          f"INT8: {len(int8_packet.detections)} boxes")
+    assert drift <= 1, f"INT8 calibration drift: {drift} boxes vs FP32"
+
+
+def _on_jetson():
+    """True on NVIDIA Jetson boards (aarch64 + Jetson device-tree model)."""
+    import platform
+    if platform.machine() != "aarch64":
+        return False
+    try:
+        with open("/proc/device-tree/model") as f:
+            return "Jetson" in f.read()
+    except OSError:
+        return False
+
+
+def _build_fp32_onnx():
+    """Export yolov8n to FP32 ONNX once, cached under data/."""
+    from ultralytics import YOLO
+    onnx_path = "data/yolov8n.onnx"
+    if not os.path.exists(onnx_path):
+        os.makedirs("data", exist_ok=True)
+        exported = YOLO("yolov8n.pt").export(format="onnx", imgsz=640)
+        os.replace(exported, onnx_path)
+    return onnx_path
+
+
+def _build_dla_engine():
+    """Build an INT8 engine targeting DLA core 0 via trtexec, cached under data/."""
+    import subprocess
+    engine_path = "data/yolov8n_dla.engine"
+    if not os.path.exists(engine_path):
+        onnx_path = _build_fp32_onnx()
+        subprocess.run(
+            ["trtexec", f"--onnx={onnx_path}", "--int8",
+             f"--saveEngine={engine_path}", "--useDLACore=0",
+             "--allowGPUFallback"],
+            check=True)
+    return engine_path
+
+
+def test_yolo_node_jetson_dla():
+    """On Jetson, the INT8 DLA engine keeps inference under 25 ms/frame.
+
+    The DLA tiles run INT8 convolutions at ~10 TOPS with zero GPU cost,
+    leaving the SMs free for tracker/encoder stages; layers the DLA can't
+    place fall back to the GPU (--allowGPUFallback)."""
+    import shutil
+    if not _on_jetson():
+        pytest.skip("Not a Jetson board, skipping DLA engine test")
+    if shutil.which("trtexec") is None:
+        pytest.skip("trtexec not on PATH, skipping DLA engine test")
+    try:
+        from ultralytics import YOLO
+    except ImportError:
+        pytest.skip("Ultralytics not installed, skipping DLA engine test")
+
+    node = YoloNode(model_name=_build_dla_engine())
+    img = get_test_image()
+
+    for i in range(3):
+        node.forward(FramePacket(frame_id=-1 - i, timestamp=time.perf_counter_ns(), image=img))
+
+    iters = 10
+    start = time.perf_counter()
+    for i in range(iters):
+        node.forward(FramePacket(frame_id=i, timestamp=time.perf_counter_ns(), image=img))
+    per_frame_ms = (time.perf_counter() - start) / iters * 1000
+    print(f"DLA INT8: {per_frame_ms:.1f} ms/frame")
+    assert per_frame_ms < 25, f"DLA inference too slow: {per_frame_ms:.1f} ms/frame"
+
+
+def _build_openvino_model():
+    """Export yolov8n to an INT8 OpenVINO IR once, cached under data/."""
+    from ultralytics import YOLO
+    path = "data/yolov8n_openvino_model"
+    if not os.path.isdir(path):
+        os.makedirs("data", exist_ok=True)
+        exported = YOLO("yolov8n.pt").export(format="openvino", int8=True,
+                                             data="coco8.yaml")
+        os.replace(exported, path)
+    return path
+
+
+def test_iou_matrix():
+    """iou_matrix matches hand-computed overlaps (jitted or NumPy path)."""
+    from dustycam.utils.iou_numba import iou_matrix
+    a = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=np.float32)
+    b = np.array([[0, 0, 10, 10], [5, 5, 15, 15], [100, 100, 110, 110]],
+                 dtype=np.float32)
+    m = iou_matrix(a, b)
+    assert m.shape == (2, 3)
+    assert m[0, 0] == pytest.approx(1.0)
+    # 5x5 intersection over (100 + 100 - 25) union
+    assert m[0, 1] == pytest.approx(25 / 175, abs=1e-6)
+    assert m[0, 2] == 0.0
+    assert m[1, 0] == 0.0
+    # Empty inputs produce empty matrices, not errors.
+    assert iou_matrix(a, np.empty((0, 4))).shape == (2, 0)
+
+
+def test_yolo_node_openvino_cpu(warm_yolo):
+    """OpenVINO INT8 IR matches PyTorch FP32 detections on the CPU.
+
+    On x86 hosts without a GPU, OpenVINO's MKLDNN + AVX-512 VNNI INT8
+    kernels run roughly twice as fast as FP32 ONNX; a quantization bug
+    would show up as boxes drifting away from the FP32 reference, so each
+    FP32 box must have an OpenVINO counterpart with IoU >= 0.5.
+    """
+    try:
+        import openvino  # noqa: F401 - AutoBackend needs it for the IR
+    except ImportError:
+        pytest.skip("openvino not installed, skipping OpenVINO CPU test")
+
+    img = get_test_image()
+
+    start = time.perf_counter()
+    fp32 = warm_yolo.forward(
+        FramePacket(frame_id=1, timestamp=time.perf_counter_ns(), image=img))
+    fp32_ms = (time.perf_counter() - start) * 1000
+
+    ov_node = YoloNode(model_name=_build_openvino_model())
+    # One untimed call to absorb graph compilation.
+    ov_node.forward(FramePacket(frame_id=0, timestamp=time.perf_counter_ns(), image=img))
+    start = time.perf_counter()
+    ov = ov_node.forward(
+        FramePacket(frame_id=2, timestamp=time.perf_counter_ns(), image=img))
+    ov_ms = (time.perf_counter() - start) * 1000
+
+    assert isinstance(ov.detections, list)
+    print(f"FP32 PyTorch: {fp32_ms:.1f} ms, OpenVINO INT8: {ov_ms:.1f} ms")
+    if len(fp32.det_array):
+        from dustycam.utils.iou_numba import iou_matrix
+        assert len(ov.det_array), "OpenVINO found no boxes where FP32 did"
+        best = iou_matrix(fp32.det_array.bbox, ov.det_array.bbox).max(axis=1)
+        assert (best >= 0.5).all(), f"FP32 boxes unmatched (best IoU {best})"
+
+
+def _build_int8_engine():
+    """Export yolov8n to an INT8-calibrated TensorRT engine, cached under data/."""
+    from ultralytics import YOLO
+    engine_path = "data/yolov8n_int8.engine"
+    if not os.path.exists(engine_path):
+        os.makedirs("data", exist_ok=True)
+        exported = YOLO("yolov8n.pt").export(format="engine", int8=True,
+                                             data="coco8.yaml", imgsz=640)
+        os.replace(exported, engine_path)
+    return engine_path
+
+
+def make_node(backend, prec):
+    """Build a YoloNode for one (backend, precision) combo, caching exports."""
+    if backend == "pt":
+        node = YoloNode(model_name="yolov8n")
+        if prec == "fp16":
+            # Ultralytics merges overrides into every predict call.
+            node._model.overrides["half"] = True
+        return node
+    if backend == "onnx":
+        path = _build_int8_onnx() if prec == "int8" else _build_fp32_onnx()
+        return YoloNode(model_name=path)
+    path = _build_engine() if prec == "fp16" else _build_int8_engine()
+    return YoloNode(model_name=path)
+
+
+@pytest.mark.parametrize("backend,prec", [
+    ("pt", "fp32"), ("pt", "fp16"),
+    ("onnx", "fp32"), ("onnx", "int8"),
+    ("trt", "fp16"), ("trt", "int8"),
+])
+def test_yolo_backend_precision_matrix(backend, prec, warm_yolo):
+    """Every backend x precision combo stays within one box of FP32.
+
+    INT8 sometimes matches FP16 and sometimes regresses depending on
+    calibration and hardware; running the full matrix against the FP32
+    reference catches a quantization or export regression in whichever
+    cell it lands. Latency per cell is logged for eyeballing."""
+    if prec == "fp16" or backend == "trt":
+        try:
+            import torch
+        except ImportError:
+            pytest.skip("torch not installed, skipping half/TensorRT combos")
+        if not torch.cuda.is_available():
+            pytest.skip("CUDA required for half/TensorRT combos")
+    if backend == "onnx":
+        try:
+            import onnxruntime  # noqa: F401 - AutoBackend needs it for .onnx
+        except ImportError:
+            pytest.skip("onnxruntime not installed, skipping ONNX combos")
+
+    img = get_test_image()
+    reference = warm_yolo.forward(
+        FramePacket(frame_id=0, timestamp=time.perf_counter_ns(), image=img))
+
+    node = warm_yolo if (backend, prec) == ("pt", "fp32") else make_node(backend, prec)
+    # One untimed call absorbs per-backend first-run costs.
+    node.forward(FramePacket(frame_id=1, timestamp=time.perf_counter_ns(), image=img))
+    start = time.perf_counter_ns()
+    result = node.forward(
+        FramePacket(frame_id=2, timestamp=time.perf_counter_ns(), image=img))
+    elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+
+    print(f"{backend}/{prec}: {elapsed_ms:.1f} ms, {len(result.detections)} boxes")
+    drift = abs(len(result.detections) - len(reference.detections))
+    assert drift <= 1, f"{backend}/{prec} drifted {drift} boxes from FP32"
+    if reference.detections and result.detections:
+        top = max(result.detections, key=lambda d: d['conf'])
+        ref_top = max(reference.detections, key=lambda d: d['conf'])
+        assert top['label'] == ref_top['label'], (
+            f"{backend}/{prec} top-1 {top['label']} != FP32 {ref_top['label']}")
+
 
 if __name__ == "__main__":
-    test_yolo_node_desktop_run()
+    pytest.main([__file__, "-k", "desktop", "-s"])